@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Precomputed aggregates for the GeoGuessr dashboard
+
+Builds a compact JSON feed from the extractor's rows so the dashboard can
+render totals, leaderboards and player statistics without downloading and
+scanning every raw row. Numbers follow the dashboard's own rules: missing
+values count as 0, and the best/worst scores ignore zero totals.
+"""
+
+import json
+import math
+from typing import Dict, List, Any, Optional, Iterable
+
+AGGREGATES_VERSION = 1
+
+
+def to_int(value: Any) -> int:
+    """Integer value of a CSV or extractor field, 0 when missing (like parseInt(x) || 0)"""
+    if value is None or value == '':
+        return 0
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def js_round(value: float) -> int:
+    """Round half up like JavaScript's Math.round, so numbers match the dashboard"""
+    return math.floor(value + 0.5)
+
+
+def duration_seconds(value: Optional[str]) -> int:
+    """Seconds in an 'HH:mm:ss' duration"""
+    if not value:
+        return 0
+    try:
+        hours, minutes, seconds = (int(part) for part in value.split(':'))
+    except ValueError:
+        return 0
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def game_label(row: Dict[str, Any]) -> str:
+    """Name the dashboard uses for a game"""
+    return row.get('challenge_title') or row.get('file_name') or ''
+
+
+class AggregatesBuilder:
+    """Aggregates extractor rows per player, map, challenge and round, one row at a time"""
+
+    def __init__(self):
+        self.row_count = 0
+        self.players = {}
+        self.maps = {}
+        self.challenges = {}
+        self.rounds = {round_num: {'points': 0, 'seconds': 0, 'steps': 0, 'count': 0} for round_num in range(1, 6)}
+        # Distinct values in first-seen order
+        self.file_names = {}
+        self.player_names = {}
+        self.game_labels = {}
+        self.map_names = {}
+        self.summary = {'scored_rows': 0, 'points_sum': 0, 'best_score': 0, 'best_player': None,
+                        'worst_score': None, 'worst_player': None}
+
+    def add_rows(self, rows):
+        for row in rows:
+            self.add(row)
+
+    def add(self, row: Dict[str, Any]):
+        summary = self.summary
+        self.row_count += 1
+        for values, value in ((self.file_names, row.get('file_name')), (self.player_names, row.get('player_name')),
+                              (self.game_labels, game_label(row)), (self.map_names, row.get('map_name'))):
+            if value:
+                values.setdefault(value, None)
+
+        name = row.get('player_name') or ''
+        total_points = to_int(row.get('total_points'))
+        won = to_int(row.get('position')) == 1
+        round_points = [to_int(row.get(f'round_{round_num}_points')) for round_num in range(1, 6)]
+
+        if total_points > 0:
+            summary['scored_rows'] += 1
+            summary['points_sum'] += total_points
+            if total_points > summary['best_score']:
+                summary['best_score'], summary['best_player'] = total_points, name
+            if summary['worst_score'] is None or total_points < summary['worst_score']:
+                summary['worst_score'], summary['worst_player'] = total_points, name
+
+        player = self.players.setdefault(name, {
+            'games': 0, 'wins': 0, 'points_sum': 0, 'steps_sum': 0, 'seconds_sum': 0,
+            'max_total': None, 'min_total': None, 'round_points_sum': 0, 'round_count': 0,
+            'max_round': None, 'round_means': [0] * 5
+        })
+        player['games'] += 1
+        player['wins'] += won
+        player['points_sum'] += total_points
+        player['steps_sum'] += to_int(row.get('total_steps'))
+        player['seconds_sum'] += duration_seconds(row.get('total_duration'))
+        player['max_total'] = total_points if player['max_total'] is None else max(player['max_total'], total_points)
+        player['min_total'] = total_points if player['min_total'] is None else min(player['min_total'], total_points)
+        player['round_points_sum'] += sum(round_points)
+        player['round_count'] += 5
+        player['max_round'] = max(round_points) if player['max_round'] is None else max(player['max_round'], *round_points)
+        for i, points in enumerate(round_points):
+            player['round_means'][i] += points
+
+        for round_num, points in enumerate(round_points, 1):
+            round_stats = self.rounds[round_num]
+            round_stats['points'] += points
+            round_stats['seconds'] += duration_seconds(row.get(f'round_{round_num}_duration'))
+            round_stats['steps'] += to_int(row.get(f'round_{round_num}_steps'))
+            round_stats['count'] += 1
+
+        map_name = row.get('map_name') or ''
+        map_stats = self.maps.setdefault(map_name, {'challenges': set(), 'rows': 0, 'points_sum': 0,
+                                                    'best_score': 0, 'best_player': None})
+        map_stats['challenges'].add(row.get('file_name'))
+        map_stats['rows'] += 1
+        map_stats['points_sum'] += total_points
+        if total_points > map_stats['best_score']:
+            map_stats['best_score'], map_stats['best_player'] = total_points, name
+
+        key = row.get('file_name') or ''
+        # Rows read back from a CSV have '' where the extractor had None
+        challenge = self.challenges.setdefault(key, {
+            'label': game_label(row), 'challenge_id': row.get('challenge_id') or None,
+            'date': row.get('challenge_date') or None, 'map': map_name, 'players': 0, 'points_sum': 0,
+            'winner': None, 'best_score': 0, 'results': {}
+        })
+        challenge['players'] += 1
+        challenge['points_sum'] += total_points
+        if won:
+            challenge['winner'] = name
+        challenge['best_score'] = max(challenge['best_score'], total_points)
+        challenge['results'][name] = [to_int(row.get('position')), total_points]
+
+    def result(self) -> Dict[str, Any]:
+        """The aggregates of all rows added so far"""
+        players = {name: dict(player, round_means=list(player['round_means'])) for name, player in self.players.items()}
+        for player in players.values():
+            player['avg_points'] = js_round(player['points_sum'] / player['games']) if player['games'] else 0
+            player['avg_steps'] = js_round(player['steps_sum'] / player['games']) if player['games'] else 0
+            player['avg_round'] = js_round(player['round_points_sum'] / player['round_count']) if player['round_count'] else 0
+            player['round_means'] = [js_round(total / player['games']) for total in player['round_means']]
+
+        # Stable sorts keep first-seen order for ties, like the dashboard's Array.sort
+        wins_leaderboard = sorted(players, key=lambda name: -players[name]['wins'])
+        points_leaderboard = sorted(players, key=lambda name: -(players[name]['points_sum'] / players[name]['games']))
+
+        ordered_challenges = sorted(self.challenges.items(), key=lambda item: (item[1]['date'] or '', item[0]))
+        time_series = [
+            {'game': key, 'label': challenge['label'], 'date': challenge['date'], 'results': challenge['results']}
+            for key, challenge in ordered_challenges
+        ]
+
+        summary = self.summary
+        return {
+            'version': AGGREGATES_VERSION,
+            'rows': self.row_count,
+            'filters': {
+                'players': list(self.player_names),
+                'games': list(self.game_labels),
+                'maps': list(self.map_names)
+            },
+            'summary': {
+                'games': len(self.file_names),
+                'avg_score': js_round(summary['points_sum'] / summary['scored_rows']) if summary['scored_rows'] else 0,
+                'best_score': summary['best_score'],
+                'best_player': summary['best_player'],
+                'worst_score': summary['worst_score'],
+                'worst_player': summary['worst_player']
+            },
+            'players': players,
+            'maps': {
+                name: {
+                    'games': len(stats['challenges']),
+                    'rows': stats['rows'],
+                    'avg_points': js_round(stats['points_sum'] / stats['rows']) if stats['rows'] else 0,
+                    'best_score': stats['best_score'],
+                    'best_player': stats['best_player']
+                }
+                for name, stats in self.maps.items()
+            },
+            'challenges': {
+                key: {
+                    **{k: v for k, v in challenge.items() if k not in ('results', 'points_sum')},
+                    'avg_points': js_round(challenge['points_sum'] / challenge['players']) if challenge['players'] else 0
+                }
+                for key, challenge in self.challenges.items()
+            },
+            'rounds': {
+                str(round_num): {
+                    'avg_points': js_round(stats['points'] / stats['count']) if stats['count'] else 0,
+                    'avg_seconds': js_round(stats['seconds'] / stats['count']) if stats['count'] else 0,
+                    'avg_steps': js_round(stats['steps'] / stats['count']) if stats['count'] else 0
+                }
+                for round_num, stats in self.rounds.items()
+            },
+            'leaderboards': {
+                'wins': wins_leaderboard,
+                'avg_points': points_leaderboard
+            },
+            'time_series': time_series
+        }
+
+
+def build_aggregates(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate extractor rows per player, map, challenge and round"""
+    builder = AggregatesBuilder()
+    builder.add_rows(rows)
+    return builder.result()
+
+
+def save_aggregates(aggregates: Dict[str, Any], output_file: str = "geoguessr_aggregates.json"):
+    """Write aggregates as compact JSON"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(aggregates, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def write_aggregates(rows: List[Dict[str, Any]], output_file: str = "geoguessr_aggregates.json"):
+    """Build the aggregates and write them as compact JSON"""
+    aggregates = build_aggregates(rows)
+    save_aggregates(aggregates, output_file)
+    return aggregates
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+GeoGuessr Analytics Benchmark
+
+Writes a synthetic results CSV (default 100,000 player results, i.e.
+500,000 round rows) and times geoguessr_analytics.py on it:
+- load: reading the CSV into NumPy columns
+- statistics: the full report (player, round, head-to-head, correlation
+  and rolling form)
+
+Results are printed and written to a JSON file so runs of different
+versions can be compared with --compare. With --max-seconds the run fails
+when load and statistics together take longer, as a timing check.
+"""
+
+import sys
+import csv
+import json
+import time
+import random
+import platform
+import tempfile
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from geoguessr_analytics import ResultsTable, ROUNDS
+from sqlite_store import CHALLENGE_COLUMNS
+from benchmark_utils import git_version
+
+COLUMNS = CHALLENGE_COLUMNS + ['position', 'player_name'] + \
+    [f'round_{r}_{field}' for r in range(1, ROUNDS + 1) for field in ('points', 'duration', 'steps')] + \
+    ['total_points', 'total_duration', 'total_steps']
+MAPS = ['World', 'Czech Republic', 'A Diverse World', 'Europe', 'Famous Places']
+
+
+def duration(seconds: int) -> str:
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def generate_results(path: Path, results: int, players: int, seed: int) -> int:
+    """Write a results CSV with about the given number of player results, returns the number written"""
+    rng = random.Random(seed)
+    names = [f"Player {i}" for i in range(players)]
+    start = datetime(2024, 1, 1, 20, 0)
+    written = 0
+    challenge = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        while written < results:
+            date = (start + timedelta(hours=challenge * 7)).isoformat() + '+01:00'
+            info = {'challenge_id': f"C{challenge:07d}", 'file_name': f"challenge_{challenge}.mhtml",
+                    'challenge_date': date, 'map_name': rng.choice(MAPS)}
+            entrants = rng.sample(names, min(rng.randint(2, 8), players))
+            rows = []
+            for name in entrants:
+                rounds = [(rng.randint(0, 5000), rng.randint(5, 180), rng.randint(0, 60)) for _ in range(ROUNDS)]
+                row = dict(info, player_name=name, total_points=sum(r[0] for r in rounds),
+                           total_duration=duration(sum(r[1] for r in rounds)), total_steps=sum(r[2] for r in rounds))
+                for r, (points, seconds, steps) in enumerate(rounds, 1):
+                    row.update({f'round_{r}_points': points, f'round_{r}_duration': duration(seconds),
+                                f'round_{r}_steps': steps})
+                rows.append(row)
+            for position, row in enumerate(sorted(rows, key=lambda row: -row['total_points']), 1):
+                row['position'] = position
+                writer.writerow([row.get(column, '') for column in COLUMNS])
+            written += len(rows)
+            challenge += 1
+    return written
+
+
+def run_benchmark(path: Path, repeat: int = 3, form_window: int = 5) -> Dict[str, Any]:
+    """Time loading and the full report, best of repeat runs"""
+    load = statistics = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        table = ResultsTable.load(str(path))
+        load = min(load, time.perf_counter() - start)
+        start = time.perf_counter()
+        table.report(form_window)
+        statistics = min(statistics, time.perf_counter() - start)
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'version': git_version(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': len(table),
+        'round_rows': len(table.round),
+        'csv_bytes': path.stat().st_size,
+        'seconds': {'load': round(load, 4), 'statistics': round(statistics, 4),
+                    'total': round(load + statistics, 4)}
+    }
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    print(f"\nAnalytics over {report['results']:,} results ({report['round_rows']:,} round rows, "
+          f"{report['csv_bytes'] / 1e6:.1f} MB CSV)")
+    for stage, seconds in report['seconds'].items():
+        line = f"- {stage:<10} {seconds:8.3f} s"
+        before = (baseline or {}).get('seconds', {}).get(stage)
+        if before:
+            line += f"  ({(seconds - before) / before * 100:+.1f}% vs baseline)"
+        print(line)
+    if baseline:
+        print(f"- baseline: version {baseline.get('version')}, {baseline.get('results'):,} results")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the analytics module on a synthetic results CSV')
+    parser.add_argument('--results', type=int, default=100000, help='Number of player results to generate')
+    parser.add_argument('--players', type=int, default=60, help='Number of distinct players')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for the results')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs to take the best time of')
+    parser.add_argument('--max-seconds', type=float,
+                        help='Fail when load and statistics together take longer than this')
+    parser.add_argument('--output', default='analytics_bench_results.json', help='JSON file for the results')
+    parser.add_argument('--compare', help='Previous results JSON to compare against')
+
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'results.csv'
+        print(f"Generating {args.results:,} synthetic results...")
+        generate_results(path, args.results, args.players, args.seed)
+        report = run_benchmark(path, args.repeat)
+    print_report(report, baseline)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.max_seconds is not None and report['seconds']['total'] > args.max_seconds:
+        print(f"Error: load and statistics took {report['seconds']['total']:.3f} s, "
+              f"more than {args.max_seconds:.3f} s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+GeoGuessr Extractor Benchmark
+
+Generates a synthetic corpus of mHTML challenge pages that use the same
+class names as real GeoGuessr results pages, then times every stage of
+GeoGuessrExtractor on it:
+- decode: reading the file and decoding its HTML part (files are memory
+  mapped and only read as the decoder touches them, so the two are timed
+  together)
+- parse: building the BeautifulSoup tree
+- extract: challenge info, game info and results table
+- export: flattening and writing the CSV
+
+Files go through GeoGuessrExtractor.process_file() and the timings are the
+totals of its StageProfiler, so the benchmark measures the code a real run
+executes. Results are printed and written to a JSON file so runs of
+different versions can be compared with --compare.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import base64
+import quopri
+import random
+import platform
+import resource
+import tempfile
+import argparse
+import contextlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from geoguessr_extractor import GeoGuessrExtractor, StageProfiler, PARSERS
+from benchmark_utils import git_version
+
+
+STAGES = ['decode', 'parse', 'extract', 'export']
+
+PLAYER_NAMES = [
+    'LuckyLuke', 'Tomas Rezac', 'Dominik Mikuš', 'Daniel Urban', 'Šárka Nováková',
+    'Jiří Čermák', 'Anna & Bob', 'Zoë <3', 'Kryštof Žák', 'Player One',
+    'Mapmaker', 'Ondřej Dvořák'
+]
+
+FILLER_ASCII = 'Explore the world = find your way around '
+FILLER_ACCENTED = 'Prozkoumejte svět = najděte cestu příště '
+
+
+def format_duration(seconds: int) -> str:
+    """Format seconds the way GeoGuessr shows them ('1 min, 5 sec')"""
+    minutes, seconds = divmod(seconds, 60)
+    return f"{minutes} min, {seconds} sec" if minutes else f"{seconds} sec"
+
+
+def html_escape(text: str) -> str:
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+
+
+def score_column(points: int, seconds: int, steps: int) -> str:
+    return (
+        f'<div class="score-cell_score__oKM2x">{points:,} pts</div>'
+        f'<div class="score-cell_scoreDetails__D_Ygp">'
+        f'<span>{points // 3 + 1} km</span><span>{format_duration(seconds)}</span><span>{steps} steps</span>'
+        f'</div>'
+    )
+
+
+def generate_challenge_html(rng: random.Random, challenge_id: str, players: List[str],
+                            qp_density: float = 0.1, filler_kb: int = 64) -> str:
+    """Generate a results page with the structure the extractor expects
+
+    qp_density is the share of filler text with non-ASCII characters, which
+    quoted-printable encoding turns into =XX escapes.
+    """
+    standings = []
+    for name in players:
+        rounds = [(rng.randint(0, 5000), rng.randint(5, 120), rng.randint(0, 80)) for _ in range(5)]
+        standings.append((name, rounds))
+    standings.sort(key=lambda standing: -sum(r[0] for r in standing[1]))
+
+    rows = ['<div class="results_row__JCFGA results_headerRow__IQUH5">'
+            '<div class="results_column__pZWgz">Player</div>'
+            + ''.join(f'<div class="results_column__pZWgz">Round {i}</div>' for i in range(1, 6))
+            + '<div class="results_column__pZWgz">Total</div></div>']
+    for position, (name, rounds) in enumerate(standings, 1):
+        columns = [
+            f'<div class="results_column__pZWgz"><span class="results_position__3Hyv4">{position}.</span>'
+            f'<div class="results_userLink__1k2fP"><a href="/user/{position}">'
+            f'<img alt="{html_escape(name)}" src="/avatar/{position}.png"></a></div></div>'
+        ]
+        for points, seconds, steps in rounds:
+            columns.append(f'<div class="results_column__pZWgz">{score_column(points, seconds, steps)}</div>')
+        total = [sum(r[i] for r in rounds) for i in range(3)]
+        columns.append(f'<div class="results_column__pZWgz"><div class="results_totalColumn__vlXbH">'
+                       f'{score_column(*total)}</div></div>')
+        rows.append('<div class="results_row__JCFGA">' + ''.join(columns) + '</div>')
+
+    # Page chrome around the results, proportional in size to filler_kb
+    filler = []
+    filler_size = 0
+    while filler_size < filler_kb * 1024:
+        text = FILLER_ACCENTED if rng.random() < qp_density else FILLER_ASCII
+        filler.append(f'<p class="page_text__Ab12c">{text}</p>')
+        filler_size += len(filler[-1])
+    half = len(filler) // 2
+
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>GeoGuessr</title>'
+        '<style>.results_table__Xy1Z{display:grid}</style></head><body>'
+        f'<div class="layout_main__Ab12c">{"".join(filler[:half])}'
+        f'<a href="https://www.geoguessr.com/results/{challenge_id}">Results</a>'
+        '<div class="results_gameInfo__W1ggd">'
+        '<div class="info-card_card__y3eBq"><h3 class="info-card_title__QWuny">Map</h3>'
+        '<div class="info-card_content___gJYt"><a href="/maps/world">World</a> Created by '
+        '<a href="/user/geoguessr">GeoGuessr</a></div></div>'
+        '<div class="info-card_card__y3eBq"><div class="info-card_content___gJYt">'
+        '<h3 class="info-card_title__QWuny">Game settings</h3><p>2 minutes per round</p></div></div>'
+        '</div>'
+        '<div class="results_tableWrapper__Q1w2e"><div class="results_table__Xy1Z">'
+        + ''.join(rows) +
+        '</div></div>'
+        f'{"".join(filler[half:])}</div></body></html>'
+    )
+
+
+def generate_mhtml(rng: random.Random, challenge_id: str, players: List[str],
+                   attachment_kb: int = 1024, qp_density: float = 0.1, filler_kb: int = 64) -> bytes:
+    """Wrap a generated page in a Chrome style multipart/related mHTML file"""
+    boundary = '----MultipartBoundary--' + ''.join(rng.choice('abcdefXYZ0123456789') for _ in range(42)) + '----'
+    url = f'https://www.geoguessr.com/results/{challenge_id}'
+    page = generate_challenge_html(rng, challenge_id, players, qp_density, filler_kb)
+    body = quopri.encodestring(page.encode('utf-8')).replace(b'\n', b'\r\n')
+
+    date = datetime(2025, 1, 1).timestamp() + rng.randint(0, 365 * 24 * 3600)
+    date_header = datetime.fromtimestamp(date).strftime('%a, %d %b %Y %H:%M:%S +0200')
+
+    chunks = [
+        ('From: <Saved by Blink>\r\n'
+         f'Snapshot-Content-Location: {url}\r\n'
+         'Subject: GeoGuessr\r\n'
+         f'Date: {date_header}\r\n'
+         'MIME-Version: 1.0\r\n'
+         'Content-Type: multipart/related;\r\n'
+         '\ttype="text/html";\r\n'
+         f'\tboundary="{boundary}"\r\n'
+         '\r\n\r\n'
+         f'--{boundary}\r\n'
+         'Content-Type: text/html\r\n'
+         'Content-ID: <frame-0@mhtml.blink>\r\n'
+         'Content-Transfer-Encoding: quoted-printable\r\n'
+         f'Content-Location: {url}\r\n'
+         '\r\n').encode('ascii'),
+        body
+    ]
+
+    # Embedded images, 64 KB each, base64 encoded like Chrome does
+    for i in range(attachment_kb // 64):
+        image = rng.getrandbits(64 * 1024 * 8).to_bytes(64 * 1024, 'little')
+        image = base64.encodebytes(image).replace(b'\n', b'\r\n')
+        chunks.append((f'\r\n--{boundary}\r\n'
+                       'Content-Type: image/png\r\n'
+                       'Content-Transfer-Encoding: base64\r\n'
+                       f'Content-Location: https://www.geoguessr.com/_next/static/images/{i}.png\r\n'
+                       '\r\n').encode('ascii'))
+        chunks.append(image)
+
+    chunks.append(f'\r\n--{boundary}--\r\n'.encode('ascii'))
+    return b''.join(chunks)
+
+
+def generate_corpus(folder: Path, count: int, seed: int = 1, min_players: int = 2, max_players: int = 8,
+                    attachment_sizes_kb: List[int] = (256, 1024, 4096), qp_densities: List[float] = (0.0, 0.1, 0.5),
+                    filler_kb: int = 64) -> List[Path]:
+    """Write count synthetic mHTML files, cycling through sizes and densities"""
+    rng = random.Random(seed)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    files = []
+    for i in range(count):
+        challenge_id = ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789')
+                               for _ in range(16))
+        players = rng.sample(PLAYER_NAMES, rng.randint(min_players, min(max_players, len(PLAYER_NAMES))))
+        attachment_kb = attachment_sizes_kb[i % len(attachment_sizes_kb)]
+        qp_density = qp_densities[(i // len(attachment_sizes_kb)) % len(qp_densities)]
+
+        file_path = folder / f'challenge_{i:05d}.mhtml'
+        file_path.write_bytes(generate_mhtml(rng, challenge_id, players, attachment_kb, qp_density, filler_kb))
+        files.append(file_path)
+
+    return files
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_benchmark(files: List[Path], parser: str = 'fast', repeat: int = 1) -> Dict[str, Any]:
+    """Run the extractor over the corpus with profiling on and return the report"""
+    extractor = GeoGuessrExtractor(parser=parser)
+    extractor.profiler = StageProfiler()
+    total_bytes = sum(f.stat().st_size for f in files)
+    skipped = 0
+    rows = 0
+
+    for _ in range(repeat):
+        all_rows = []
+        # process_file() prints a line per file, which would bury the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            for file_path in files:
+                file_data = extractor.process_file_safe(file_path)
+                if file_data is None:
+                    skipped += 1
+                    continue
+                all_rows.extend(extractor.flatten_file_data(file_data))
+
+            with tempfile.TemporaryDirectory() as tmp:
+                extractor.write_csv(all_rows, os.path.join(tmp, 'results.csv'))
+        rows = len(all_rows)
+
+    stages = extractor.profiler.summary()
+    wall = {stage: stages.get(stage, {}).get('wall_seconds', 0.0) for stage in StageProfiler.STAGES}
+    timings = {stage: wall[stage] for stage in STAGES}
+    timings['decode'] += wall['read']
+    html_bytes = stages.get('parse', {}).get('bytes', 0)
+
+    total_time = sum(timings.values())
+    file_count = len(files) * repeat
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'version': git_version(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parser': parser,
+        'files': len(files),
+        'repeat': repeat,
+        'input_mb': total_bytes / 1e6,
+        'html_mb': html_bytes / repeat / 1e6,
+        'rows': rows,
+        'skipped_files': skipped // repeat,
+        'stages': {stage: {'seconds': round(seconds, 6), 'share': round(seconds / total_time, 4) if total_time else 0}
+                   for stage, seconds in timings.items()},
+        'total_seconds': round(total_time, 6),
+        'files_per_sec': round(file_count / total_time, 2) if total_time else None,
+        'mb_per_sec': round(total_bytes * repeat / 1e6 / total_time, 2) if total_time else None,
+        'peak_rss_mb': round(peak_rss_mb(), 1)
+    }
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    """Print the report, with changes against a baseline run if given"""
+    print(f"\nBenchmark ({report['parser']} parser, {report['files']} files x {report['repeat']}, "
+          f"{report['input_mb']:.1f} MB input, {report['html_mb']:.1f} MB HTML)")
+    for stage in STAGES:
+        seconds = report['stages'][stage]['seconds']
+        line = f"- {stage:<8} {seconds:9.3f} s  {report['stages'][stage]['share'] * 100:5.1f}%"
+        if baseline:
+            before = baseline['stages'].get(stage, {}).get('seconds', 0)
+            if stage == 'decode':
+                # Older reports timed reading separately
+                before += baseline['stages'].get('read', {}).get('seconds', 0)
+            if before:
+                line += f"  ({(seconds - before) / before * 100:+.1f}% vs baseline)"
+        print(line)
+
+    print(f"- total    {report['total_seconds']:9.3f} s")
+    if report['skipped_files']:
+        print(f"- skipped files (not extractable): {report['skipped_files']}")
+    print(f"- {report['files_per_sec']} files/sec, {report['mb_per_sec']} MB/sec, peak RSS {report['peak_rss_mb']} MB")
+    if baseline and baseline.get('files_per_sec'):
+        change = (report['files_per_sec'] - baseline['files_per_sec']) / baseline['files_per_sec'] * 100
+        print(f"- throughput {change:+.1f}% vs baseline ({baseline.get('version')})")
+
+
+def parse_list(value: str, cast) -> List:
+    return [cast(item) for item in value.split(',') if item]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the GeoGuessr extractor on a synthetic corpus')
+    parser.add_argument('--files', type=int, default=30, help='Number of synthetic files to generate')
+    parser.add_argument('--players', default='2-8', help='Player count range per challenge, e.g. 2-8')
+    parser.add_argument('--attachment-kb', default='256,1024,4096',
+                        help='Comma separated sizes of embedded resources per file in KB')
+    parser.add_argument('--qp-density', default='0.0,0.1,0.5',
+                        help='Comma separated shares of non-ASCII filler text')
+    parser.add_argument('--filler-kb', type=int, default=64, help='Size of page HTML around the results in KB')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for the corpus')
+    parser.add_argument('--corpus', help='Keep the corpus in this folder (reused if it already has files)')
+    parser.add_argument('--parser', choices=PARSERS, default='fast', help='Extractor parser to benchmark')
+    parser.add_argument('--repeat', type=int, default=1, help='Number of passes over the corpus')
+    parser.add_argument('--output', default='bench_results.json', help='JSON file for the results')
+    parser.add_argument('--compare', help='Previous results JSON to compare against')
+
+    args = parser.parse_args()
+
+    min_players, _, max_players = args.players.partition('-')
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(args.corpus) if args.corpus else Path(tmp)
+        files = sorted(folder.glob('*.mhtml')) if args.corpus else []
+        if not files:
+            print(f"Generating {args.files} synthetic mHTML files in {folder}...")
+            files = generate_corpus(folder, args.files, args.seed, int(min_players), int(max_players or min_players),
+                                    parse_list(args.attachment_kb, int), parse_list(args.qp_density, float),
+                                    args.filler_kb)
+
+        report = run_benchmark(files, args.parser, args.repeat)
+
+    report['corpus'] = {
+        'players': args.players,
+        'attachment_kb': args.attachment_kb,
+        'qp_density': args.qp_density,
+        'filler_kb': args.filler_kb,
+        'seed': args.seed
+    }
+    print_report(report, baseline)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Dashboard Server Load Test
+
+Starts the dashboard server from serve_dashboard.py on a free local port
+(in its own process, without opening a browser) and lets concurrent
+clients fetch the dashboard and its data file in three scenarios:
+- cold: a new connection per request, without cached copies
+- revalidate: a new connection per request, with If-None-Match and
+  If-Modified-Since from an earlier response, like a browser reloading
+- keep-alive: one persistent connection per client, full responses
+
+Each scenario reports requests/sec, p50/p95/p99 latency and bytes
+transferred. Results are printed and written to a JSON file, so serving
+modes (--simple) and versions can be compared with --compare.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import threading
+import http.client
+import multiprocessing
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, NamedTuple, Optional, Tuple
+
+from serve_dashboard import make_server
+from benchmark_utils import git_version
+
+
+SCENARIOS = ['cold', 'revalidate', 'keep-alive']
+DEFAULT_PATHS = ['/dashboard.html', '/geoguessr_results.csv']
+
+
+class Sample(NamedTuple):
+    """One request: latency until the body was read, status (0 on errors) and bytes received"""
+    seconds: float
+    status: int
+    bytes: int
+
+
+def serve(directory: str, production: bool, ready: multiprocessing.Queue):
+    """Run the dashboard server on a free port, reporting the port through ready"""
+    # The handlers log every request to stderr
+    sys.stderr = open(os.devnull, 'w')
+    with make_server(0, production, directory, host='127.0.0.1') as httpd:
+        ready.put(httpd.server_address[1])
+        httpd.serve_forever()
+
+
+def start_server_process(directory: str, production: bool = True) -> Tuple[multiprocessing.Process, int]:
+    """Start the server process and wait until it listens, returns it with its port"""
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(directory, production, ready), daemon=True)
+    process.start()
+    return process, ready.get(timeout=30)
+
+
+def response_size(response: http.client.HTTPResponse, body: bytes) -> int:
+    """Bytes on the wire for a response, status line and headers included"""
+    status_line = f"HTTP/{response.version / 10:.1f} {response.status} {response.reason}\r\n"
+    return len(status_line) + len(str(response.msg)) + len(body)
+
+
+def fetch_validators(port: int, paths: List[str], headers: Dict[str, str]) -> Dict[str, Dict[str, str]]:
+    """Conditional request headers for each path, from one full response"""
+    validators = {}
+    for path in paths:
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        connection.request('GET', path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        connection.close()
+        if response.status != 200:
+            raise RuntimeError(f"GET {path} returned {response.status} {response.reason}")
+        validators[path] = {}
+        if response.getheader('ETag'):
+            validators[path]['If-None-Match'] = response.getheader('ETag')
+        if response.getheader('Last-Modified'):
+            validators[path]['If-Modified-Since'] = response.getheader('Last-Modified')
+    return validators
+
+
+def run_client(port: int, scenario: str, paths: List[str], requests: int, headers: Dict[str, str],
+               validators: Dict[str, Dict[str, str]], start: threading.Barrier) -> List[Sample]:
+    """Send requests for paths in turn, as one client of the scenario"""
+    samples = []
+    keep_alive = scenario == 'keep-alive'
+    connection = None
+    start.wait()
+
+    for i in range(requests):
+        path = paths[i % len(paths)]
+        request_headers = dict(headers)
+        if scenario == 'revalidate':
+            request_headers.update(validators[path])
+        if not keep_alive:
+            request_headers['Connection'] = 'close'
+        if connection is None:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+
+        began = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=request_headers)
+            response = connection.getresponse()
+            body = response.read()
+            samples.append(Sample(time.perf_counter() - began, response.status, response_size(response, body)))
+        except (OSError, http.client.HTTPException):
+            samples.append(Sample(time.perf_counter() - began, 0, 0))
+            connection.close()
+            connection = None
+            continue
+
+        if not keep_alive or response.will_close:
+            connection.close()
+            connection = None
+
+    if connection is not None:
+        connection.close()
+    return samples
+
+
+def percentile(sorted_values: List[float], share: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(share * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(port: int, scenario: str, paths: List[str], clients: int, requests: int,
+                 headers: Dict[str, str], validators: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+    """Run all clients of one scenario at once and summarize their samples"""
+    start = threading.Barrier(clients + 1)
+    results: List[List[Sample]] = [[] for _ in range(clients)]
+
+    def client(index: int):
+        results[index] = run_client(port, scenario, paths, requests, headers, validators, start)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - began
+
+    samples = [sample for client_samples in results for sample in client_samples]
+    latencies = sorted(sample.seconds * 1000 for sample in samples)
+    statuses: Dict[str, int] = {}
+    for sample in samples:
+        status = str(sample.status or 'error')
+        statuses[status] = statuses.get(status, 0) + 1
+    transferred = sum(sample.bytes for sample in samples)
+
+    return {
+        'requests': len(samples),
+        'errors': statuses.get('error', 0),
+        'statuses': statuses,
+        'seconds': round(seconds, 4),
+        'requests_per_sec': round(len(samples) / seconds, 1) if seconds else None,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50), 3),
+            'p95': round(percentile(latencies, 0.95), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'max': round(latencies[-1], 3) if latencies else 0.0
+        },
+        'bytes': transferred,
+        'mb_per_sec': round(transferred / 1e6 / seconds, 2) if seconds else None
+    }
+
+
+def run_benchmark(directory: str, scenarios: List[str] = SCENARIOS, paths: List[str] = DEFAULT_PATHS,
+                  clients: int = 8, requests: int = 200, production: bool = True,
+                  gzip: bool = True) -> Dict[str, Any]:
+    """Start a server on directory, run the scenarios against it and return the report"""
+    headers = {'Accept-Encoding': 'gzip'} if gzip else {}
+    process, port = start_server_process(directory, production)
+    try:
+        validators = fetch_validators(port, paths, headers)
+        results = {scenario: run_scenario(port, scenario, paths, clients, requests, headers, validators)
+                   for scenario in scenarios}
+    finally:
+        process.terminate()
+        process.join()
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'version': git_version(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'server': 'threaded' if production else 'simple',
+        'gzip': gzip,
+        'clients': clients,
+        'requests_per_client': requests,
+        'paths': paths,
+        'scenarios': results
+    }
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    """Print the report, with changes against a baseline run if given"""
+    print(f"\nServer load test ({report['server']} server, {report['clients']} clients x "
+          f"{report['requests_per_client']} requests, {'gzip' if report['gzip'] else 'no gzip'}, "
+          f"{' '.join(report['paths'])})")
+    for scenario, result in report['scenarios'].items():
+        latency = result['latency_ms']
+        statuses = ', '.join(f"{count} x {status}" for status, count in sorted(result['statuses'].items()))
+        line = (f"- {scenario:<10} {result['requests_per_sec']:9.1f} req/s  p50 {latency['p50']:7.2f} ms  "
+                f"p95 {latency['p95']:7.2f} ms  p99 {latency['p99']:7.2f} ms  "
+                f"{result['bytes'] / 1e6:8.2f} MB  ({statuses})")
+        before = (baseline or {}).get('scenarios', {}).get(scenario)
+        if before and before.get('requests_per_sec'):
+            change = (result['requests_per_sec'] - before['requests_per_sec']) / before['requests_per_sec'] * 100
+            line += f"  ({change:+.1f}% req/s vs baseline)"
+        print(line)
+    if baseline:
+        print(f"- baseline: {baseline.get('server')} server, version {baseline.get('version')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the dashboard server with concurrent clients')
+    parser.add_argument('--clients', type=int, default=8, help='Number of concurrent clients')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per client and scenario')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help='Scenario to run, can be repeated (default: all)')
+    parser.add_argument('--path', action='append',
+                        help=f"Path to fetch, can be repeated (default: {' '.join(DEFAULT_PATHS)})")
+    parser.add_argument('--simple', action='store_true', help='Load test the plain single-threaded server')
+    parser.add_argument('--no-gzip', action='store_true', help='Do not send Accept-Encoding: gzip')
+    parser.add_argument('--directory', default=str(Path(__file__).parent),
+                        help='Folder to serve (default: the dashboard folder)')
+    parser.add_argument('--output', default='server_bench_results.json', help='JSON file for the results')
+    parser.add_argument('--compare', help='Previous results JSON to compare against')
+
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    paths = [path if path.startswith('/') else f'/{path}' for path in (args.path or DEFAULT_PATHS)]
+    try:
+        report = run_benchmark(args.directory, args.scenario or SCENARIOS, paths, args.clients, args.requests,
+                               production=not args.simple, gzip=not args.no_gzip)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print_report(report, baseline)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
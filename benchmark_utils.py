@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Helpers shared by the benchmark scripts
+
+Kept free of the extractor's dependencies, so benchmark_server.py can run
+without BeautifulSoup installed.
+"""
+
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+
+def git_version() -> Optional[str]:
+    """Current commit of the repository, if any"""
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
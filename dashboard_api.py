@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Query API for the GeoGuessr dashboard server
+
+Loads the results CSV once into memory with indexes by player, map, game
+and date, and answers filtered queries for the dashboard:
+- /api/filters: players, games and maps to choose from
+- /api/player-stats: per-player totals for the filtered rows
+- /api/leaderboard: players ordered by wins and by average points
+- /api/map-stats: per-map statistics
+- /api/timeseries: per-game results in date order
+
+Every endpoint accepts the same filters: player (repeatable), game, map,
+from and to (ISO dates). Results of recent filter combinations are kept in
+a bounded LRU cache that is cleared whenever the CSV changes on disk.
+"""
+
+import csv
+import bisect
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from aggregates import build_aggregates, game_label
+
+ENDPOINTS = ['filters', 'player-stats', 'leaderboard', 'map-stats', 'timeseries']
+
+
+class ResultsIndex:
+    """Results rows with indexes for the dashboard filters"""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        self.all = list(range(len(rows)))
+        self.by_player: Dict[str, List[int]] = {}
+        self.by_map: Dict[str, List[int]] = {}
+        self.by_game: Dict[str, List[int]] = {}
+        for i, row in enumerate(rows):
+            self.by_player.setdefault(row.get('player_name') or '', []).append(i)
+            self.by_map.setdefault(row.get('map_name') or '', []).append(i)
+            self.by_game.setdefault(game_label(row), []).append(i)
+
+        # Rows sorted by date for range lookups; rows without a date sort first
+        dated = sorted((row.get('challenge_date') or '', i) for i, row in enumerate(rows))
+        self.dates = [date for date, _ in dated]
+        self.date_order = [i for _, i in dated]
+
+    @classmethod
+    def from_csv(cls, csv_file: Path) -> 'ResultsIndex':
+        with open(csv_file, 'r', newline='', encoding='utf-8') as f:
+            return cls(list(csv.DictReader(f)))
+
+    def query(self, players: Optional[List[str]] = None, game: Optional[str] = None, map_name: Optional[str] = None,
+              date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[int]:
+        """Indices of the matching rows, in file order"""
+        candidates = []
+        if players:
+            candidates.append([i for player in players for i in self.by_player.get(player, [])])
+        if game:
+            candidates.append(self.by_game.get(game, []))
+        if map_name:
+            candidates.append(self.by_map.get(map_name, []))
+        if date_from or date_to:
+            start = bisect.bisect_left(self.dates, date_from) if date_from else 0
+            # Dates are ISO timestamps, so a bare 'to' date includes that whole day
+            end = bisect.bisect_right(self.dates, date_to + '\uffff') if date_to else len(self.dates)
+            candidates.append(self.date_order[start:end])
+
+        if not candidates:
+            return self.all
+
+        # Intersect starting from the most selective index
+        candidates.sort(key=len)
+        matches = set(candidates[0])
+        for other in candidates[1:]:
+            matches.intersection_update(other)
+            if not matches:
+                break
+        return sorted(matches)
+
+
+class DashboardAPI:
+    """Answers dashboard queries from an in-memory index of the results CSV"""
+
+    def __init__(self, csv_file: str, cache_size: int = 256):
+        self.csv_file = Path(csv_file)
+        self.cache_size = cache_size
+        self.cache: 'OrderedDict[Tuple, Dict[str, Any]]' = OrderedDict()
+        self.index: Optional[ResultsIndex] = None
+        self.data_key = None
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def current_index(self) -> ResultsIndex:
+        """The index for the CSV as it is on disk now, reloaded when the file changed"""
+        stat = self.csv_file.stat()
+        data_key = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            if data_key != self.data_key:
+                self.index = ResultsIndex.from_csv(self.csv_file)
+                self.data_key = data_key
+                self.cache.clear()
+            return self.index
+
+    def aggregates_for(self, filters: Tuple) -> Dict[str, Any]:
+        """Aggregates of the rows matching the filters, through the LRU cache"""
+        index = self.current_index()
+        with self.lock:
+            if filters in self.cache:
+                self.cache.move_to_end(filters)
+                self.hits += 1
+                return self.cache[filters]
+
+        players, game, map_name, date_from, date_to = filters
+        # Rows stay in file order, so players keep the order the dashboard shows them in
+        rows = [index.rows[i] for i in index.query(sorted(players), game, map_name, date_from, date_to)]
+        aggregates = build_aggregates(rows)
+
+        with self.lock:
+            self.misses += 1
+            self.cache[filters] = aggregates
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return aggregates
+
+    def handle(self, endpoint: str, params: Dict[str, List[str]]) -> Optional[Dict[str, Any]]:
+        """Answer one API request, None for an unknown endpoint"""
+        if endpoint not in ENDPOINTS:
+            return None
+
+        players = params.get('player', [])
+        players = frozenset() if 'all' in players else frozenset(name for name in players if name)
+        game = self.single(params, 'game')
+        map_name = self.single(params, 'map')
+        filters = (players, game, map_name, self.single(params, 'from'), self.single(params, 'to'))
+        aggregates = self.aggregates_for(filters)
+
+        if endpoint == 'filters':
+            return aggregates['filters']
+        if endpoint == 'player-stats':
+            return {'rows': aggregates['rows'], 'players': list(aggregates['players'].items())}
+        if endpoint == 'leaderboard':
+            players_stats = aggregates['players']
+            return {name: [{'player': player, **players_stats[player]} for player in order]
+                    for name, order in aggregates['leaderboards'].items()}
+        if endpoint == 'map-stats':
+            return aggregates['maps']
+        return {'series': aggregates['time_series']}
+
+    @staticmethod
+    def single(params: Dict[str, List[str]], name: str) -> Optional[str]:
+        """A single-valued filter, None when absent or 'all'"""
+        values = params.get(name)
+        if not values or not values[0] or values[0] == 'all':
+            return None
+        return values[0]
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Folder watcher for new GeoGuessr saves
+
+Reports mHTML files that were added, changed or removed in a folder. On
+Linux it listens to inotify events, elsewhere (or when inotify is not
+available) it scans the folder every poll interval. Either way a file is
+only reported once its size and modification time have stopped changing
+for the debounce period, so files that are still being saved are skipped
+until the browser is done writing them.
+"""
+
+import os
+import time
+import errno
+import fnmatch
+import select
+import struct
+import ctypes
+import ctypes.util
+from pathlib import Path
+from typing import Dict, List, Optional, Iterator, Tuple
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class Inotify:
+    """Minimal inotify binding through ctypes"""
+
+    def __init__(self, folder: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), WATCH_MASK) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f'inotify_add_watch failed for {folder}')
+
+    def read(self, timeout: float) -> Optional[List[str]]:
+        """Names of the files with events, waiting up to timeout; None if events were lost"""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return []
+            raise
+
+        names = []
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            if mask & IN_Q_OVERFLOW:
+                return None
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FolderWatcher:
+    """Yields batches of settled changes to the files in a folder"""
+
+    def __init__(self, folder: str, patterns: Tuple[str, ...] = ('*.mhtml',), debounce: float = 0.5,
+                 poll_interval: float = 0.5, use_inotify: bool = True):
+        self.folder = Path(folder)
+        self.patterns = patterns
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        # Files as last reported: name -> (size, mtime_ns)
+        self.known = self.scan()
+        # Files seen changing: name -> (last seen stat, when it last changed)
+        self.pending: Dict[str, Tuple[Optional[Tuple[int, int]], float]] = {}
+
+        self.inotify = None
+        if use_inotify and hasattr(select, 'select'):
+            try:
+                self.inotify = Inotify(self.folder)
+            except (OSError, AttributeError):
+                # Not Linux, or out of watches: fall back to polling
+                self.inotify = None
+        self.mode = 'inotify' if self.inotify else f'polling every {poll_interval:g}s'
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """Size and mtime of every matching file in the folder"""
+        files = {}
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if self.matches(entry.name) and entry.is_file():
+                    stat = entry.stat()
+                    files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def matches(self, name: str) -> bool:
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.patterns)
+
+    def file_stat(self, name: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.folder / name)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def mark(self, name: str, now: float):
+        """Start (or keep) tracking a file that may have changed"""
+        if self.matches(name) and name not in self.pending:
+            self.pending[name] = (self.file_stat(name), now)
+
+    def mark_differences(self, now: float):
+        """Track every file whose stat differs from what was last reported"""
+        current = self.scan()
+        for name in set(current) | set(self.known):
+            if current.get(name) != self.known.get(name):
+                self.mark(name, now)
+
+    def settled(self, now: float) -> Tuple[List[Path], List[Path]]:
+        """Pending files that have stopped changing, as (changed, deleted)"""
+        changed, deleted = [], []
+        for name, (last_stat, since) in list(self.pending.items()):
+            stat = self.file_stat(name)
+            if stat != last_stat:
+                self.pending[name] = (stat, now)
+                continue
+            if now - since < self.debounce:
+                continue
+
+            del self.pending[name]
+            if stat is None:
+                if self.known.pop(name, None) is not None:
+                    deleted.append(self.folder / name)
+            elif self.known.get(name) != stat:
+                self.known[name] = stat
+                changed.append(self.folder / name)
+        return sorted(changed), sorted(deleted)
+
+    def changes(self) -> Iterator[Tuple[List[Path], List[Path]]]:
+        """Block and yield (changed, deleted) file lists as changes settle"""
+        tick = max(0.05, min(0.25, self.debounce / 2))
+        next_scan = time.monotonic()
+        while True:
+            if self.inotify:
+                names = self.inotify.read(tick if self.pending else self.poll_interval)
+                now = time.monotonic()
+                if names is None:
+                    # The kernel dropped events, compare against the folder instead
+                    self.mark_differences(now)
+                else:
+                    for name in names:
+                        self.mark(name, now)
+            else:
+                time.sleep(tick if self.pending else min(tick, self.poll_interval))
+                now = time.monotonic()
+                if now >= next_scan:
+                    self.mark_differences(now)
+                    next_scan = now + self.poll_interval
+
+            changed, deleted = self.settled(now)
+            if changed or deleted:
+                yield changed, deleted
+
+    def close(self):
+        if self.inotify:
+            self.inotify.close()
+            self.inotify = None
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Compact per-challenge archive of the page parts the extractor parses
+
+For every extracted challenge the archive keeps one small .json.gz record:
+the decoded game info and results table HTML fragments, the top-level MIME
+header block and the few page lines the challenge info comes from. That is
+a few KB instead of the multi-MB mHTML save, and enough to run the
+extractor's parsing again, e.g. after fixing selectors for renamed classes,
+without the original files.
+
+Records are named after the challenge ID, so another save of the same
+challenge replaces its record (with duplicates kept, a hash of the save's
+file name is added), and records outlive the saves they came from. An
+index.json next to the records keeps what is needed to order and dedupe
+them, so re-extraction can plan without decompressing every record.
+"""
+
+import os
+import re
+import gzip
+import json
+import hashlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+FRAGMENTS_VERSION = 1
+RECORD_SUFFIX = '.json.gz'
+INDEX_FILE = 'index.json'
+INDEX_VERSION = 1
+
+
+class ArchivedSave:
+    """The save a record came from, used in place of its Path"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __str__(self) -> str:
+        return f"{self.name} (archived)"
+
+
+def record_name(challenge_id: Optional[str], file_name: str, per_save: bool = False) -> str:
+    """File name of a challenge's record, from the file name for pages without an ID
+
+    With per_save (duplicate saves kept) every save of a challenge gets its
+    own record.
+    """
+    if not challenge_id:
+        return f"file-{re.sub(r'[^A-Za-z0-9._-]', '_', file_name)}{RECORD_SUFFIX}"
+    if per_save:
+        return f"{challenge_id}-{hashlib.sha256(file_name.encode('utf-8')).hexdigest()[:12]}{RECORD_SUFFIX}"
+    return f"{challenge_id}{RECORD_SUFFIX}"
+
+
+def run_position(record: Dict[str, Any]) -> List[Any]:
+    """The save's place in a full run: plain files by name, then archive members"""
+    source = record['source']
+    if source['archive'] is None:
+        return [0, record['file_name'], 0, record['file_name']]
+    return [1, source['archive'], source['index'] or 0, record['file_name']]
+
+
+def save_record(folder: Path, name: str, record: Dict[str, Any]) -> bool:
+    """Write a record unless it is unchanged, returns whether it was written"""
+    # mtime=0 keeps the bytes identical when the fragments are
+    data = gzip.compress(json.dumps({'version': FRAGMENTS_VERSION, **record}, ensure_ascii=False,
+                                    separators=(',', ':')).encode('utf-8'), mtime=0)
+    path = folder / name
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+
+    folder.mkdir(parents=True, exist_ok=True)
+    # Worker processes may write records at the same time
+    tmp_file = folder / f"{name}.{os.getpid()}.tmp"
+    tmp_file.write_bytes(data)
+    os.replace(tmp_file, path)
+    return True
+
+
+def load_record(path: Path) -> Optional[Dict[str, Any]]:
+    """A record, None when unreadable or from another version"""
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            record = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Ignoring unreadable fragment record {path}: {e}")
+        return None
+    return record if record.get('version') == FRAGMENTS_VERSION else None
+
+
+def index_records(folder: Path) -> Dict[str, Dict[str, Any]]:
+    """Index entries of the records in a folder, by record file name
+
+    Entries are cached in index.json and only records that changed since
+    (by size and mtime) are loaded again. Unreadable records get no entry.
+    """
+    index_file = folder / INDEX_FILE
+    cached = {}
+    if index_file.exists():
+        try:
+            with open(index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') == INDEX_VERSION:
+                cached = index.get('records', {})
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable fragment index {index_file}: {e}")
+
+    entries = {}
+    for path in folder.glob('*' + RECORD_SUFFIX):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entry = cached.get(path.name)
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+            entries[path.name] = entry
+            continue
+        record = load_record(path)
+        if record is None:
+            continue
+        date = record.get('challenge_date')
+        entries[path.name] = {
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'file_name': record['file_name'],
+            'position': run_position(record),
+            'challenge_id': record.get('challenge_id'),
+            'saved_at': datetime.fromisoformat(date).timestamp() if date else None,
+            'results_size': len(record['html'])
+        }
+
+    if entries != cached:
+        tmp_file = folder / f"{INDEX_FILE}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'records': entries}, f, ensure_ascii=False)
+        os.replace(tmp_file, index_file)
+    return entries
+
+
+def list_records(folder: Path, dedupe: bool = True) -> List[Path]:
+    """Record files in the order a full run meets their saves: plain files by name, then archive members
+
+    With dedupe, only one record per challenge is listed, chosen like the
+    extractor's dedupe_files(): the snapshot saved last, then the one with
+    more results markup, then the first file name. Records written with
+    duplicates kept then give the same output as a deduplicating run.
+    """
+    entries = index_records(folder)
+    names = list(entries)
+    if dedupe:
+        challenges = {}
+        for name, entry in entries.items():
+            if entry['challenge_id']:
+                challenges.setdefault(entry['challenge_id'], []).append(name)
+        dropped = set()
+        for saves in challenges.values():
+            kept = min(saves, key=lambda name: (-(entries[name]['saved_at'] or 0),
+                                                -entries[name]['results_size'], entries[name]['file_name']))
+            dropped.update(name for name in saves if name != kept)
+        names = [name for name in names if name not in dropped]
+    return [folder / name for name in sorted(names, key=lambda name: entries[name]['position'])]
@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+GeoGuessr Results Analytics
+
+Loads the extractor's output into a columnar, NumPy-backed table and
+computes statistics over it with vectorized operations:
+- per-player and per-round means and percentiles
+- win rates and a head-to-head matrix
+- correlation between round score and time taken
+- rolling form over each player's most recent games
+
+Requires numpy. Reads the CSV written by geoguessr_extractor.py, or the
+SQLite database written with --output-format sqlite.
+"""
+
+import io
+import csv
+import json
+import sqlite3
+import argparse
+from itertools import compress
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Any, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+ROUNDS = 5
+PERCENTILES = [10, 50, 90]
+KEY_COLUMNS = ['file_name', 'challenge_id', 'challenge_date', 'map_name', 'player_name']
+# Longest number that fits an int64
+MAX_DIGITS = 18
+
+
+class Fields(NamedTuple):
+    """Values of one column as spans of a UTF-8 byte buffer
+
+    Numbers and text are decoded from the buffer with whole-array operations,
+    never with Python code per value.
+    """
+    data: np.ndarray
+    starts: np.ndarray
+    lengths: np.ndarray
+    # Fields that were quoted in a CSV, whose doubled quotes still need undoing
+    quoted: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_values(cls, values: Sequence[str]) -> 'Fields':
+        """Fields of a sequence of strings, joined with line breaks into one buffer"""
+        text = '\n'.join(values)
+        if text.count('\n') != max(len(values) - 1, 0):
+            # Line breaks would split values, they never occur in the key or number columns
+            text = '\n'.join(value.replace('\n', ' ') for value in values)
+        data = np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+        if not len(values):
+            return cls(data, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        ends = np.concatenate((np.flatnonzero(data == ord('\n')), [len(data)]))
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        return cls(data, starts, ends - starts)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def select(self, rows: np.ndarray) -> 'Fields':
+        """The fields of the selected rows, sharing the buffer"""
+        return Fields(self.data, self.starts[rows], self.lengths[rows],
+                      None if self.quoted is None else self.quoted[rows])
+
+    def chars(self, width: int) -> np.ndarray:
+        """The first width bytes of every value as a (values, width) matrix, padded with zeros"""
+        position = np.arange(width)
+        if not len(self.data):
+            return np.zeros((len(self), width), dtype=np.uint8)
+        matrix = self.data[np.minimum(self.starts[:, None] + position, len(self.data) - 1)]
+        return np.where(position < self.lengths[:, None], matrix, 0).astype(np.uint8)
+
+    def text(self) -> np.ndarray:
+        """The values as a NumPy string array"""
+        width = int(self.lengths.max()) if len(self) else 0
+        if width == 0:
+            return np.full(len(self), '', dtype=str)
+        chars = self.chars(width)
+        raw = chars.view(f'S{width}').ravel()
+        if (chars < 0x80).all():
+            values = raw.astype(str)
+        else:
+            # Decode each distinct value once
+            distinct, inverse = np.unique(raw, return_inverse=True)
+            values = np.char.decode(distinct, 'utf-8', 'replace')[inverse]
+        if self.quoted is not None and self.quoted.any():
+            values[self.quoted] = np.char.replace(values[self.quoted], '""', '"')
+        return values
+
+    def numbers(self, units: Sequence[int]) -> np.ndarray:
+        """Sum of the ':'-separated digit groups of each value times units, 0 when a value has another form
+
+        Values are read one character position at a time for all rows at
+        once, like a vectorized Horner scheme.
+        """
+        count = len(self)
+        last_group = len(units) - 1
+        scale = np.array(units, dtype=np.int64)
+        # Longer values do not fit an int64 and count as malformed
+        valid = (self.lengths > 0) & (self.lengths <= MAX_DIGITS)
+        total = np.zeros(count, dtype=np.int64)
+        value = np.zeros(count, dtype=np.int64)
+        group = np.zeros(count, dtype=np.int64)
+        group_digits = np.zeros(count, dtype=np.int64)
+        for position in range(min(int(self.lengths.max()) if count else 0, MAX_DIGITS)):
+            inside = position < self.lengths
+            char = self.data[np.minimum(self.starts + position, len(self.data) - 1)]
+            # Bytes below '0' wrap around to large values
+            digit = char - np.uint8(ord('0'))
+            is_digit = inside & (digit <= 9)
+            is_colon = inside & (char == ord(':'))
+            # Every group needs a digit before its colon
+            valid &= (is_digit | ~inside) | (is_colon & (group_digits > 0))
+            total += np.where(is_colon, value * scale[np.minimum(group, last_group)], 0)
+            group += is_colon
+            value = np.where(is_colon, 0, np.where(is_digit, value * 10 + digit, value))
+            group_digits = np.where(is_colon, 0, group_digits + is_digit)
+        valid &= (group == last_group) & (group_digits > 0)
+        total += value * scale[np.minimum(group, last_group)]
+        return np.where(valid, total, 0)
+
+
+def duration_seconds(fields: Fields) -> np.ndarray:
+    """Seconds in 'HH:mm:ss' durations, 0 when missing or malformed"""
+    return fields.numbers((3600, 60, 1))
+
+
+def to_int(fields: Fields) -> np.ndarray:
+    """Integers from CSV strings, 0 when missing (like the dashboard's parseInt(x) || 0)"""
+    return fields.numbers((1,))
+
+
+def split_csv(data: bytes) -> Optional[Dict[str, Fields]]:
+    """Column fields of a CSV by header name, None when not every row has the header's number of fields
+
+    Separators are found in the whole file at once: a comma or line break
+    after an odd number of quotes is inside a quoted field.
+    """
+    if not data.endswith(b'\n'):
+        data += b'\n'
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    quotes = np.flatnonzero(buffer == ord('"'))
+    separators = np.flatnonzero((buffer == ord(',')) | (buffer == ord('\n')))
+    if len(quotes):
+        separators = separators[np.searchsorted(quotes, separators) % 2 == 0]
+
+    line_ends = buffer[separators] == ord('\n')
+    fields_per_row = np.diff(np.concatenate(([-1], np.flatnonzero(line_ends))))
+    if not (fields_per_row == fields_per_row[0]).all():
+        return None
+
+    starts = np.concatenate(([0], separators[:-1] + 1))
+    ends = separators - (line_ends & (buffer[separators - 1] == ord('\r')))
+    quoted = (ends - starts >= 2) & (buffer[starts] == ord('"')) & (buffer[ends - 1] == ord('"'))
+    shape = (-1, fields_per_row[0])
+    starts = (starts + quoted).reshape(shape)
+    lengths = (ends - quoted).reshape(shape) - starts
+    quoted = quoted.reshape(shape)
+
+    header = [data[start:start + length].decode('utf-8').replace('""', '"')
+              for start, length in zip(starts[0].tolist(), lengths[0].tolist())]
+    return {name: Fields(buffer, starts[1:, i], lengths[1:, i], quoted[1:, i]) for i, name in enumerate(header)}
+
+
+def group_percentiles(groups: np.ndarray, values: np.ndarray, group_count: int,
+                      percentiles: List[float]) -> np.ndarray:
+    """Percentiles of values within each group (linear interpolation, like np.percentile)
+
+    Returns an array of shape (group_count, len(percentiles)), NaN for empty groups.
+    """
+    if np.issubdtype(values.dtype, np.integer) and len(values):
+        # Sorting a combined key and reading the values back from it is much
+        # faster than lexsort or argsort
+        low = int(values.min())
+        span = int(values.max()) - low + 1
+        key = np.sort(groups.astype(np.int64) * span + (values.astype(np.int64) - low))
+        sorted_values = (key % span + low).astype(np.float64)
+    else:
+        sorted_values = values[np.lexsort((values, groups))].astype(np.float64)
+    counts = np.bincount(groups, minlength=group_count)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    result = np.full((group_count, len(percentiles)), np.nan)
+    present = counts > 0
+    for column, percentile in enumerate(percentiles):
+        position = starts[present] + (counts[present] - 1) * (percentile / 100)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        fraction = position - lower
+        result[present, column] = sorted_values[lower] * (1 - fraction) + sorted_values[upper] * fraction
+    return result
+
+
+def group_correlation(groups: np.ndarray, x: np.ndarray, y: np.ndarray, group_count: int) -> np.ndarray:
+    """Pearson correlation of x and y within each group, NaN where it is undefined"""
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    n = np.bincount(groups, minlength=group_count).astype(np.float64)
+    sum_x = np.bincount(groups, x, group_count)
+    sum_y = np.bincount(groups, y, group_count)
+    sum_xx = np.bincount(groups, x * x, group_count)
+    sum_yy = np.bincount(groups, y * y, group_count)
+    sum_xy = np.bincount(groups, x * y, group_count)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covariance = n * sum_xy - sum_x * sum_y
+        spread = np.sqrt((n * sum_xx - sum_x ** 2) * (n * sum_yy - sum_y ** 2))
+        return np.where(spread > 0, covariance / spread, np.nan)
+
+
+class ResultsTable:
+    """Extracted results as NumPy columns
+
+    Result rows (one per player and challenge) and round rows (five per
+    result) are kept as parallel arrays. Players and challenges are stored
+    as integer codes into the `players` and `challenges` lists.
+    """
+
+    def __init__(self, columns: Dict[str, Fields]):
+        # Only the key columns become string arrays, numbers are parsed straight from the bytes
+        text = {name: columns[name].text() for name in KEY_COLUMNS}
+        challenge_keys = np.where(text['challenge_id'] != '', text['challenge_id'], text['file_name'])
+
+        # Challenges are coded in date order (then key), so codes sort chronologically
+        dates = text['challenge_date']
+        keys, first_row, challenge_codes = np.unique(challenge_keys, return_index=True, return_inverse=True)
+        order = np.lexsort((keys, dates[first_row]))
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        self.challenges: List[str] = keys[order].tolist()
+        self.challenge_dates: List[str] = dates[first_row][order].tolist()
+        self.challenge_maps: List[str] = text['map_name'][first_row][order].tolist()
+        self.challenge = rank[challenge_codes]
+
+        names, self.player = np.unique(text['player_name'], return_inverse=True)
+        self.players: List[str] = names.tolist()
+
+        self.position = to_int(columns['position'])
+        self.total_points = to_int(columns['total_points'])
+        self.total_seconds = duration_seconds(columns['total_duration'])
+        self.total_steps = to_int(columns['total_steps'])
+
+        # Round rows: result row i has its rounds at i * ROUNDS ... i * ROUNDS + 4
+        self.round_result = np.repeat(np.arange(len(self.player)), ROUNDS)
+        self.round = np.tile(np.arange(1, ROUNDS + 1), len(self.player))
+        self.round_points = np.column_stack(
+            [to_int(columns[f'round_{r}_points']) for r in range(1, ROUNDS + 1)]).ravel()
+        self.round_seconds = np.column_stack(
+            [duration_seconds(columns[f'round_{r}_duration']) for r in range(1, ROUNDS + 1)]).ravel()
+        self.round_steps = np.column_stack(
+            [to_int(columns[f'round_{r}_steps']) for r in range(1, ROUNDS + 1)]).ravel()
+
+    @classmethod
+    def from_fields(cls, columns: Dict[str, Fields]) -> 'ResultsTable':
+        """Build the table from column fields"""
+        count = len(next(iter(columns.values()))) if columns else 0
+        # Keep rows with a player, like the dashboard and the SQLite store
+        players = columns.get('player_name')
+        has_player = players.lengths > 0 if players is not None else np.zeros(count, dtype=bool)
+        selected = columns if has_player.all() else {name: fields.select(has_player) for name, fields in columns.items()}
+        # Missing columns are empty
+        empty = Fields.from_values([''] * int(has_player.sum()))
+        return cls(defaultdict(lambda: empty, selected))
+
+    @classmethod
+    def from_rows(cls, header: List[str], rows: Sequence[Sequence[str]]) -> 'ResultsTable':
+        """Build the table from rows of strings in the CSV layout"""
+        # Rows with missing or extra fields are skipped
+        lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+        if not (lengths == len(header)).all():
+            rows = list(compress(rows, lengths == len(header)))
+        columns = dict(zip(header, zip(*rows))) if rows else dict.fromkeys(header, ())
+        return cls.from_fields({name: Fields.from_values(values) for name, values in columns.items()})
+
+    @classmethod
+    def load(cls, path: str) -> 'ResultsTable':
+        """Load a results CSV, or the results view of a SQLite database"""
+        if Path(path).suffix in ('.db', '.sqlite', '.sqlite3'):
+            conn = sqlite3.connect(path)
+            try:
+                header = [row[1] for row in conn.execute('PRAGMA table_info(results)')]
+                # SQLite turns the values into the CSV's strings, NULL into ''
+                fields = ', '.join(f'COALESCE(CAST("{name}" AS TEXT), \'\')' for name in header)
+                rows = conn.execute(f'SELECT {fields} FROM results ORDER BY file_name, position').fetchall()
+            finally:
+                conn.close()
+            return cls.from_rows(header, rows)
+
+        data = Path(path).read_bytes()
+        columns = split_csv(data)
+        if columns is not None:
+            return cls.from_fields(columns)
+
+        # Some rows have a different number of fields, leave them to the csv module
+        reader = csv.reader(io.StringIO(data.decode('utf-8'), newline=''))
+        header = next(reader, [])
+        return cls.from_rows(header, list(reader))
+
+    def __len__(self) -> int:
+        return len(self.player)
+
+    def player_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Games, wins, win rate, and mean and percentiles of total and round scores per player"""
+        count = len(self.players)
+        games = np.bincount(self.player, minlength=count)
+        wins = np.bincount(self.player, self.position == 1, count).astype(np.int64)
+        mean_total = np.bincount(self.player, self.total_points, count) / np.maximum(games, 1)
+        total_percentiles = group_percentiles(self.player, self.total_points, count, PERCENTILES)
+
+        round_player = self.player[self.round_result]
+        mean_round = np.bincount(round_player, self.round_points, count) / np.maximum(games * ROUNDS, 1)
+        round_percentiles = group_percentiles(round_player, self.round_points, count, PERCENTILES)
+        mean_seconds = np.bincount(round_player, self.round_seconds, count) / np.maximum(games * ROUNDS, 1)
+
+        return {
+            name: {
+                'games': int(games[i]),
+                'wins': int(wins[i]),
+                'win_rate': float(wins[i] / games[i]) if games[i] else 0.0,
+                'mean_total': float(mean_total[i]),
+                'total_percentiles': dict(zip(PERCENTILES, total_percentiles[i].tolist())),
+                'mean_round': float(mean_round[i]),
+                'round_percentiles': dict(zip(PERCENTILES, round_percentiles[i].tolist())),
+                'mean_round_seconds': float(mean_seconds[i])
+            }
+            for i, name in enumerate(self.players)
+        }
+
+    def round_stats(self) -> Dict[int, Dict[str, Any]]:
+        """Mean and percentiles of points, mean time and steps for each round number"""
+        groups = self.round - 1
+        counts = np.bincount(groups, minlength=ROUNDS)
+        divisor = np.maximum(counts, 1)
+        mean_points = np.bincount(groups, self.round_points, ROUNDS) / divisor
+        mean_seconds = np.bincount(groups, self.round_seconds, ROUNDS) / divisor
+        mean_steps = np.bincount(groups, self.round_steps, ROUNDS) / divisor
+        percentiles = group_percentiles(groups, self.round_points, ROUNDS, PERCENTILES)
+
+        return {
+            r + 1: {
+                'count': int(counts[r]),
+                'mean_points': float(mean_points[r]),
+                'points_percentiles': dict(zip(PERCENTILES, percentiles[r].tolist())),
+                'mean_seconds': float(mean_seconds[r]),
+                'mean_steps': float(mean_steps[r])
+            }
+            for r in range(ROUNDS)
+        }
+
+    def position_matrix(self) -> np.ndarray:
+        """Challenges x players matrix of finishing positions, NaN where a player did not play"""
+        matrix = np.full((len(self.challenges), len(self.players)), np.nan)
+        matrix[self.challenge, self.player] = np.where(self.position > 0, self.position, np.nan)
+        return matrix
+
+    def head_to_head(self) -> np.ndarray:
+        """wins[i, j]: challenges both played where player i finished ahead of player j"""
+        positions = self.position_matrix()
+        player_count = len(self.players)
+        # Compare every pair of players within each challenge, grouped by challenge
+        challenge, player = np.nonzero(~np.isnan(positions))
+        values = positions[challenge, player]
+        counts = np.bincount(challenge, minlength=len(positions))
+        sizes = counts[challenge]
+        first = np.repeat(np.arange(len(player)), sizes)
+        offset = np.arange(len(first)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        second = np.repeat((np.cumsum(counts) - counts)[challenge], sizes) + offset
+        ahead = values[first] < values[second]
+        wins = np.bincount(player[first[ahead]] * player_count + player[second[ahead]],
+                           minlength=player_count * player_count)
+        return wins.reshape(player_count, player_count)
+
+    def score_time_correlation(self) -> Tuple[float, Dict[str, float]]:
+        """Pearson correlation between round points and round time, overall and per player
+
+        Rounds without a recorded time are left out.
+        """
+        timed = self.round_seconds > 0
+        points = self.round_points[timed]
+        seconds = self.round_seconds[timed]
+        overall = group_correlation(np.zeros(len(points), dtype=np.int64), points, seconds, 1)[0]
+        per_player = group_correlation(self.player[self.round_result][timed], points, seconds, len(self.players))
+        return float(overall), dict(zip(self.players, per_player.tolist()))
+
+    def rolling_form(self, window: int = 5) -> Dict[str, Dict[str, Any]]:
+        """Mean total score over each player's last `window` games, in challenge date order
+
+        Returns the series per player and the latest value compared to the
+        player's overall mean.
+        """
+        order = np.lexsort((self.challenge, self.player))
+        players = self.player[order]
+        totals = self.total_points[order].astype(np.float64)
+
+        counts = np.bincount(players, minlength=len(self.players))
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        index_in_group = np.arange(len(order)) - starts[players]
+
+        cumulative = np.concatenate(([0.0], np.cumsum(totals)))
+        end = np.arange(1, len(order) + 1)
+        begin = end - np.minimum(index_in_group + 1, window)
+        form = (cumulative[end] - cumulative[begin]) / (end - begin)
+
+        means = np.bincount(players, totals, len(self.players)) / np.maximum(counts, 1)
+        # Split the sorted columns into per-player groups in one go
+        bounds = np.cumsum(counts)[:-1]
+        series = np.split(form, bounds)
+        challenges = np.split(np.array(self.challenges, dtype=object)[self.challenge[order]], bounds)
+        latest = form[np.maximum(starts + counts - 1, 0)] if len(form) else np.zeros(len(counts))
+        vs_mean = latest - means
+
+        result = {}
+        for i in np.flatnonzero(counts):
+            result[self.players[i]] = {
+                'series': series[i].tolist(),
+                'challenges': challenges[i].tolist(),
+                'latest': float(latest[i]),
+                'vs_mean': float(vs_mean[i])
+            }
+        return result
+
+    def report(self, window: int = 5) -> Dict[str, Any]:
+        """All statistics as a JSON-serializable dict"""
+        overall, per_player = self.score_time_correlation()
+        head_to_head = self.head_to_head()
+        return {
+            'results': len(self),
+            'rounds': len(self.round_points),
+            'challenges': len(self.challenges),
+            'players': self.player_stats(),
+            'round_stats': self.round_stats(),
+            'head_to_head': {
+                'players': self.players,
+                'wins': head_to_head.tolist()
+            },
+            'score_time_correlation': {
+                'overall': None if np.isnan(overall) else overall,
+                'players': {name: None if np.isnan(r) else r for name, r in per_player.items()}
+            },
+            'form': self.rolling_form(window)
+        }
+
+
+def format_value(value: Optional[float], digits: int = 0) -> str:
+    if value is None or np.isnan(value):
+        return '-'
+    return f"{value:,.{digits}f}"
+
+
+def print_report(table: ResultsTable, window: int = 5, top: int = 15):
+    """Print the statistics as text tables"""
+    players = table.player_stats()
+    ranked = sorted(players, key=lambda name: -players[name]['mean_total'])[:top]
+
+    print(f"{len(table)} results, {len(table.round_points)} rounds, {len(table.challenges)} challenges, "
+          f"{len(table.players)} players")
+
+    print(f"\nPlayers (by average total, top {len(ranked)}):")
+    print(f"{'Player':<24} {'Games':>5} {'Wins':>5} {'Win %':>6} {'Avg':>7} {'P10':>7} {'P50':>7} {'P90':>7} "
+          f"{'Rnd avg':>8} {'Rnd P90':>8}")
+    for name in ranked:
+        stats = players[name]
+        total = stats['total_percentiles']
+        rounds = stats['round_percentiles']
+        print(f"{name[:24]:<24} {stats['games']:>5} {stats['wins']:>5} {stats['win_rate'] * 100:>5.1f}% "
+              f"{format_value(stats['mean_total']):>7} {format_value(total[10]):>7} {format_value(total[50]):>7} "
+              f"{format_value(total[90]):>7} {format_value(stats['mean_round']):>8} {format_value(rounds[90]):>8}")
+
+    print("\nRounds:")
+    print(f"{'Round':<6} {'Avg pts':>8} {'P10':>7} {'P50':>7} {'P90':>7} {'Avg s':>6} {'Steps':>6}")
+    for round_num, stats in table.round_stats().items():
+        percentiles = stats['points_percentiles']
+        print(f"{round_num:<6} {format_value(stats['mean_points']):>8} {format_value(percentiles[10]):>7} "
+              f"{format_value(percentiles[50]):>7} {format_value(percentiles[90]):>7} "
+              f"{format_value(stats['mean_seconds']):>6} {format_value(stats['mean_steps'], 1):>6}")
+
+    print("\nHead to head (row finished ahead of column):")
+    index = {name: i for i, name in enumerate(table.players)}
+    wins = table.head_to_head()
+    labels = [name[:8] for name in ranked]
+    print(f"{'':<16} " + ' '.join(f"{label:>8}" for label in labels))
+    for name in ranked:
+        print(f"{name[:16]:<16} " + ' '.join(
+            f"{'-' if other == name else wins[index[name], index[other]]:>8}" for other in ranked))
+
+    overall, per_player = table.score_time_correlation()
+    print(f"\nScore vs. time correlation: {format_value(overall, 2)} overall")
+    for name in ranked:
+        print(f"- {name}: {format_value(per_player[name], 2)}")
+
+    form = table.rolling_form(window)
+    print(f"\nForm (average of the last {window} games):")
+    for name in sorted((name for name in ranked if name in form), key=lambda name: -form[name]['latest']):
+        print(f"- {name}: {format_value(form[name]['latest'])} ({form[name]['vs_mean']:+,.0f} vs. overall)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Statistics over extracted GeoGuessr results')
+    parser.add_argument('--input', default='geoguessr_results.csv',
+                        help='Results CSV, or a .db written with --output-format sqlite (default: geoguessr_results.csv)')
+    parser.add_argument('--form-window', type=int, default=5, help='Games in the rolling form average (default: 5)')
+    parser.add_argument('--top', type=int, default=15, help='Players shown in the report (default: 15)')
+    parser.add_argument('--json', metavar='FILE', help='Also write all statistics to FILE as JSON')
+    args = parser.parse_args()
+
+    table = ResultsTable.load(args.input)
+    if not len(table):
+        print(f"No results in {args.input}")
+        return
+
+    print_report(table, args.form_window, args.top)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(table.report(args.form_window), f, ensure_ascii=False, indent=2)
+        print(f"\nStatistics written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,81 +13,333 @@ import os
 import re
 import csv
 import json
-import html
+import time
+import mmap
+import hashlib
+import binascii
+import statistics
+from contextlib import contextmanager, nullcontext
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
+from email.parser import BytesHeaderParser
 from bs4 import BeautifulSoup
-from typing import Dict, List, Any, Optional
+from sqlite_store import SQLiteResultsStore, challenge_key
+from aggregates import AggregatesBuilder, build_aggregates, save_aggregates
+from folder_watcher import FolderWatcher
+from mhtml_archives import ARCHIVE_SUFFIXES, ArchiveMember, is_archive, list_archive_members, close_archives
+from fragment_archive import ArchivedSave, record_name, save_record, load_record, index_records, list_records
+from ratings import update_ratings
+from shards import parse_shard_by, write_shards
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 import argparse
 
 
+# Columns of the output CSV, in order
+CSV_COLUMNS = [
+    'file_name', 'challenge_id', 'challenge_date', 'challenge_title',
+    'map_name', 'map_creator', 'game_settings', 'time_limit', 'movement', 'panning', 'zooming',
+    'position', 'player_name',
+    'round_1_points', 'round_1_duration', 'round_1_steps',
+    'round_2_points', 'round_2_duration', 'round_2_steps',
+    'round_3_points', 'round_3_duration', 'round_3_steps',
+    'round_4_points', 'round_4_duration', 'round_4_steps',
+    'round_5_points', 'round_5_duration', 'round_5_steps',
+    'total_points', 'total_duration', 'total_steps'
+]
+
+# End of a MIME header block
+BLANK_LINE_RE = re.compile(rb'\r?\n\r?\n')
+
+# Anything longer in front of the first blank line is not a MIME header block
+MAX_HEADER_SIZE = 64 * 1024
+
+# Parsers for --parser: 'fast' and 'lxml' only parse the results table and
+# game info subtrees, 'html.parser' parses the whole page
+PARSERS = ['fast', 'lxml', 'html.parser']
+
+# Formats for --output-format
+OUTPUT_FORMATS = ['csv', 'sqlite']
+
+# Opening tags of the subtrees extract_game_info() and extract_results_table() look at
+GAME_INFO_START_RE = re.compile(r'<div\b[^>]*\bclass="(?:[^"]*\s)?results_gameInfo__W1ggd[\s"]')
+RESULTS_TABLE_START_RE = re.compile(r'<div\b[^>]*\bclass="[^"]*results_table')
+DIV_TAG_RE = re.compile(r'<(/?)div\b', re.IGNORECASE)
+
+# What extract_challenge_info() looks for in the headers and page
+DATE_RE = re.compile(r'Date:\s*(.+)')
+CHALLENGE_URL_RE = re.compile(r'https://www\.geoguessr\.com/results/([A-Za-z0-9]+)')
+SUBJECT_RE = re.compile(r'Subject:\s*(.+)')
+
+# Files handed to each worker process ahead of the one being written out
+IN_FLIGHT_PER_WORKER = 4
+
+# Streaming output is flushed to disk after this many files or seconds, whichever comes first
+FLUSH_EVERY_FILES = 100
+FLUSH_EVERY_SECONDS = 5.0
+
+# Bump when the manifest layout or the extracted row format changes
+MANIFEST_VERSION = 2
+
+# Bump when the challenge dedup index layout changes
+CHALLENGE_INDEX_VERSION = 1
+
+
+# Shared no-op context for stages when profiling is off
+NO_PROFILE = nullcontext()
+
+
+class StageProfiler:
+    """Records wall time, CPU time and bytes processed per stage and file"""
+    
+    STAGES = ['scan', 'read', 'decode', 'parse', 'extract', 'export']
+    
+    def __init__(self):
+        self.records = []
+    
+    @contextmanager
+    def stage(self, stage: str, file_name: str, size: int = 0):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.records.append({
+                'file_name': file_name,
+                'stage': stage,
+                'wall_seconds': time.perf_counter() - wall_start,
+                'cpu_seconds': time.process_time() - cpu_start,
+                'bytes': size
+            })
+    
+    def __getstate__(self):
+        # Worker processes start empty and send back only their own records
+        return {'records': []}
+    
+    def drain(self) -> List[Dict[str, Any]]:
+        """Hand over the records collected so far (used by worker processes)"""
+        records, self.records = self.records, []
+        return records
+    
+    def per_file(self) -> Dict[str, Dict[str, float]]:
+        """Wall time per stage for every file, plus a total"""
+        files = {}
+        for record in self.records:
+            if record['stage'] == 'export':
+                continue
+            stages = files.setdefault(record['file_name'], {'total': 0.0})
+            stages[record['stage']] = stages.get(record['stage'], 0.0) + record['wall_seconds']
+            stages['total'] += record['wall_seconds']
+        return files
+    
+    def outliers(self) -> List[Tuple[str, float]]:
+        """Files whose total time is far above the typical file
+        
+        A file is an outlier when it takes more than three times the median,
+        and more than three median absolute deviations above it.
+        """
+        totals = {name: stages['total'] for name, stages in self.per_file().items()}
+        if len(totals) < 3:
+            return []
+        
+        median = statistics.median(totals.values())
+        mad = statistics.median(abs(total - median) for total in totals.values())
+        return sorted(
+            ((name, total) for name, total in totals.items()
+             if total > 3 * median and total > median + 3 * mad),
+            key=lambda item: -item[1]
+        )
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Totals per stage"""
+        stages = {}
+        for record in self.records:
+            totals = stages.setdefault(record['stage'], {'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'bytes': 0, 'calls': 0})
+            totals['wall_seconds'] += record['wall_seconds']
+            totals['cpu_seconds'] += record['cpu_seconds']
+            totals['bytes'] += record['bytes']
+            totals['calls'] += 1
+        return stages
+    
+    def print_summary(self):
+        print("\nProfile:")
+        for stage, totals in self.summary().items():
+            print(f"- {stage:<8} wall {totals['wall_seconds']:8.3f} s  cpu {totals['cpu_seconds']:8.3f} s  "
+                  f"{totals['bytes'] / 1e6:9.1f} MB  ({totals['calls']} calls)")
+        
+        outliers = self.outliers()
+        if outliers:
+            print(f"Outlier files ({len(outliers)}):")
+            for name, total in outliers:
+                print(f"- {name}: {total:.3f} s")
+    
+    def write_report(self, report_file: str):
+        """Write the records as CSV or, for any other extension, as JSON"""
+        if report_file.endswith('.csv'):
+            outliers = {name for name, _ in self.outliers()}
+            with open(report_file, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=['file_name', 'stage', 'wall_seconds', 'cpu_seconds', 'bytes', 'outlier'])
+                writer.writeheader()
+                for record in self.records:
+                    writer.writerow({**record, 'outlier': record['file_name'] in outliers})
+        else:
+            with open(report_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'stages': self.summary(),
+                    'files': self.per_file(),
+                    'outliers': [{'file_name': name, 'wall_seconds': total} for name, total in self.outliers()],
+                    'records': self.records
+                }, f, indent=2)
+        print(f"Profile report written to {report_file}")
+
+
 class GeoGuessrExtractor:
-    def __init__(self, games_folder: str = "games"):
+    def __init__(self, games_folder: str = "games", jobs: Optional[int] = None, parser: str = 'fast',
+                 output_format: str = 'csv'):
         self.games_folder = Path(games_folder)
         self.extracted_data = []
+        # Number of worker processes, defaults to the CPU count
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+        if parser not in PARSERS:
+            raise ValueError(f"Unknown parser '{parser}', expected one of {', '.join(PARSERS)}")
+        self.parser = parser
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format '{output_format}', expected one of {', '.join(OUTPUT_FORMATS)}")
+        self.output_format = output_format
+        # Set to a StageProfiler to record per-stage timings
+        self.profiler = None
+        # Where to write the precomputed dashboard aggregates, None to skip them
+        self.aggregates_file = None
+        # Where to keep the incremental player ratings, None to skip them
+        self.ratings_file = None
+        # 'month' or a number of challenges per shard to also write time shards, None to skip them
+        self.shard_by = None
+        self.shards_dir = 'geoguessr_shards'
+        # Folder to keep the parsed page fragments of every extracted challenge in, None to skip them
+        self.fragments_dir = None
+        # Collapse several saves of the same challenge into one
+        self.dedupe = True
+        # Files collapsed by the last dedupe_files(), name -> kept file and reason
+        self.duplicates = {}
+    
+    def stage(self, stage: str, file_name: str, size: int = 0):
+        """Context manager timing a stage when profiling is on, a no-op otherwise"""
+        if self.profiler is None:
+            return NO_PROFILE
+        return self.profiler.stage(stage, file_name, size)
         
-    def extract_mhtml_content(self, file_path: Path) -> Optional[str]:
-        """Extract HTML content from mHTML file"""
+    @staticmethod
+    def map_file(file_path: Path):
+        """Memory-map a file read-only, or return b'' for an empty file
+        
+        Only the pages that are actually searched or sliced get read from
+        disk, so large embedded images and fonts are never copied into memory.
+        Archive members can not be mapped and are read into memory instead.
+        """
+        if isinstance(file_path, ArchiveMember):
+            return file_path.read_bytes()
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b''
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def extract_mhtml_parts(self, file_path: Path) -> Optional[Tuple[str, str]]:
+        """Extract the top-level MIME headers and the decoded HTML part from an mHTML file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            with self.stage('read', file_path.name, file_path.stat().st_size):
+                data = self.map_file(file_path)
             
-            # Find the HTML content section
-            html_start = content.find('<!DOCTYPE html>')
-            if html_start == -1:
+            # Pages are read from disk as the decoder touches them
+            try:
+                with self.stage('decode', file_path.name, len(data)):
+                    parts = self.decode_mhtml(data)
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
+            if parts is None:
                 print(f"Warning: No HTML content found in {file_path}")
-                return None
-                
-            # Extract HTML content
-            html_content = content[html_start:]
+            return parts
             
-            # Clean up HTML-encoded characters using Python's html module
-            html_content = html.unescape(html_content)
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+            return None
+    
+    def extract_mhtml_content(self, file_path: Path) -> Optional[str]:
+        """Extract HTML content from mHTML file"""
+        parts = self.extract_mhtml_parts(file_path)
+        return parts[1] if parts else None
+    
+    def decode_mhtml(self, data: bytes) -> Optional[Tuple[str, str]]:
+        """Split a multipart/related document and decode only its text/html part
+        
+        Returns the top-level header block and the decoded HTML. The bodies of
+        the other parts (images, CSS, fonts) are skipped without being copied.
+        Files that are plain HTML rather than MIME are returned as they are.
+        data can be bytes or an mmap of the file.
+        """
+        header_end = self._find_blank_line(data, 0)
+        boundary = None
+        if header_end is not None and header_end[0] <= MAX_HEADER_SIZE:
+            headers = BytesHeaderParser().parsebytes(data[:header_end[0]])
+            if headers.get_content_maintype() == 'multipart':
+                boundary = headers.get_param('boundary')
+        
+        if not boundary:
+            html_start = data.find(b'<!DOCTYPE html>')
+            if html_start == -1:
+                return None
+            return '', data[html_start:].decode('utf-8', errors='replace')
+        
+        header_text = data[:header_end[0]].decode('utf-8', errors='replace')
+        delimiter = b'--' + boundary.encode('ascii')
+        
+        pos = data.find(delimiter, header_end[1])
+        while pos != -1:
+            part_start = pos + len(delimiter)
+            if data[part_start:part_start + 2] == b'--':
+                break  # closing delimiter
             
-            # Additional cleanup for quoted-printable encoding
-            html_content = html_content.replace('=3D', '=')
-            html_content = html_content.replace('=3C', '<')
-            html_content = html_content.replace('=3E', '>')
-            html_content = html_content.replace('=22', '"')
-            html_content = html_content.replace('=20', ' ')
-            html_content = html_content.replace('=0A', '')
-            html_content = html_content.replace('=0D', '')
-            html_content = html_content.replace('=\n', '')
-            html_content = html_content.replace('=\r', '')
+            part_header_end = self._find_blank_line(data, part_start)
+            if part_header_end is None:
+                break
             
-            # Fix UTF-8 encoded characters (like Czech characters)
-            html_content = self.decode_utf8_entities(html_content)
+            # The line break before the next delimiter belongs to the delimiter
+            next_pos = data.find(b'\n' + delimiter, part_header_end[1])
+            body_end = len(data) if next_pos == -1 else next_pos
+            if body_end > part_header_end[1] and data[body_end - 1:body_end] == b'\r':
+                body_end -= 1
             
-            return html_content
+            part_headers = BytesHeaderParser().parsebytes(data[part_start:part_header_end[0]].lstrip())
+            if part_headers.get_content_type() == 'text/html':
+                body = data[part_header_end[1]:body_end]
+                encoding = part_headers.get('Content-Transfer-Encoding', '').strip().lower()
+                if encoding == 'quoted-printable':
+                    body = binascii.a2b_qp(body)
+                elif encoding == 'base64':
+                    body = binascii.a2b_base64(body)
+                
+                charset = part_headers.get_content_charset() or 'utf-8'
+                try:
+                    return header_text, body.decode(charset, errors='replace')
+                except LookupError:
+                    return header_text, body.decode('utf-8', errors='replace')
             
-        except Exception as e:
-            print(f"Error reading {file_path}: {e}")
+            pos = -1 if next_pos == -1 else next_pos + 1
+        
+        return None
+    
+    @staticmethod
+    def _find_blank_line(data: bytes, start: int) -> Optional[Tuple[int, int]]:
+        """Find the blank line ending a MIME header block as (header end, body start)"""
+        match = BLANK_LINE_RE.search(data, start)
+        if not match:
             return None
+        return match.start(), match.end()
     
-    def decode_utf8_entities(self, text: str) -> str:
-        """Decode UTF-8 encoded entities like =C5=A1 to proper characters"""
-        import urllib.parse
-        
-        # Find all patterns like =XX=XX (UTF-8 encoded characters)
-        def replace_utf8_entity(match):
-            encoded_bytes = match.group(1)
-            try:
-                # Convert =XX=XX format to bytes
-                hex_pairs = encoded_bytes.split('=')
-                hex_pairs = [pair for pair in hex_pairs if pair]  # Remove empty strings
-                byte_values = [int(pair, 16) for pair in hex_pairs]
-                bytes_obj = bytes(byte_values)
-                # Decode as UTF-8
-                return bytes_obj.decode('utf-8')
-            except (ValueError, UnicodeDecodeError):
-                return match.group(0)  # Return original if decoding fails
-        
-        # Pattern to match =XX=XX sequences (UTF-8 encoded characters)
-        pattern = r'=([A-F0-9]{2}(?:=[A-F0-9]{2})*)'
-        return re.sub(pattern, replace_utf8_entity, text)
-    
-    def extract_challenge_info(self, content: str, file_path: Path) -> Dict[str, Any]:
-        """Extract challenge date and ID from mHTML content"""
+    def extract_challenge_info(self, content: str, file_path: Path, headers: str = '') -> Dict[str, Any]:
+        """Extract challenge date and ID from mHTML headers and content"""
         challenge_info = {
             'file_name': file_path.name,
             'challenge_id': None,
@@ -96,7 +348,7 @@ class GeoGuessrExtractor:
         }
         
         # Extract date from mHTML header
-        date_match = re.search(r'Date:\s*(.+)', content)
+        date_match = DATE_RE.search(headers or content)
         if date_match:
             try:
                 date_str = date_match.group(1).strip()
@@ -105,13 +357,14 @@ class GeoGuessrExtractor:
             except ValueError:
                 print(f"Warning: Could not parse date from {file_path}")
         
-        # Extract challenge ID from URL
-        url_match = re.search(r'https://www\.geoguessr\.com/results/([A-Za-z0-9]+)', content)
+        # Extract challenge ID from URL, the saved page's own (Snapshot-Content-Location) first,
+        # which is also where scan_file() takes it from when deduplicating
+        url_match = CHALLENGE_URL_RE.search(headers) or CHALLENGE_URL_RE.search(content)
         if url_match:
             challenge_info['challenge_id'] = url_match.group(1)
         
         # Extract challenge title
-        title_match = re.search(r'Subject:\s*(.+)', content)
+        title_match = SUBJECT_RE.search(content)
         if title_match:
             challenge_info['challenge_title'] = title_match.group(1).strip()
         
@@ -330,26 +583,76 @@ class GeoGuessrExtractor:
         
         return results
     
+    def find_element_span(self, html_content: str, start_re: re.Pattern) -> Optional[Tuple[int, int]]:
+        """Find the start and end offsets of the first div whose opening tag matches start_re"""
+        start_match = start_re.search(html_content)
+        if not start_match:
+            return None
+        
+        depth = 0
+        for tag in DIV_TAG_RE.finditer(html_content, start_match.start()):
+            depth += -1 if tag.group(1) else 1
+            if depth == 0:
+                end = html_content.find('>', tag.end())
+                return (start_match.start(), end + 1) if end != -1 else None
+        
+        return None
+    
+    def extract_result_fragments(self, html_content: str) -> Optional[str]:
+        """Cut the game info and results table subtrees out of the page
+        
+        Returns None when either subtree cannot be located, so the caller can
+        fall back to parsing the whole page.
+        """
+        spans = []
+        for start_re in (GAME_INFO_START_RE, RESULTS_TABLE_START_RE):
+            span = self.find_element_span(html_content, start_re)
+            if span is None:
+                return None
+            spans.append(span)
+        
+        # Keep document order and drop a subtree nested inside the other one
+        spans.sort()
+        if spans[1][1] <= spans[0][1]:
+            spans = spans[:1]
+        
+        return ''.join(html_content[start:end] for start, end in spans)
+    
+    def parse_html(self, html_content: str) -> BeautifulSoup:
+        """Parse the page with the configured parser"""
+        if self.parser != 'html.parser':
+            fragments = self.extract_result_fragments(html_content)
+            if fragments is not None:
+                return BeautifulSoup(fragments, 'lxml' if self.parser == 'lxml' else 'html.parser')
+        
+        return BeautifulSoup(html_content, 'html.parser')
+    
     def process_file(self, file_path: Path) -> Optional[Dict[str, Any]]:
         """Process a single mHTML file and extract all data"""
         print(f"Processing {file_path.name}...")
         
         # Extract HTML content
-        html_content = self.extract_mhtml_content(file_path)
-        if not html_content:
+        parts = self.extract_mhtml_parts(file_path)
+        if not parts:
             return None
+        headers, html_content = parts
         
         # Parse HTML
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Extract challenge info
-        challenge_info = self.extract_challenge_info(html_content, file_path)
+        with self.stage('parse', file_path.name, len(html_content)):
+            soup = self.parse_html(html_content)
         
-        # Extract game info
-        game_info = self.extract_game_info(soup)
+        with self.stage('extract', file_path.name, len(html_content)):
+            # Extract challenge info
+            challenge_info = self.extract_challenge_info(html_content, file_path, headers)
+            
+            # Extract game info
+            game_info = self.extract_game_info(soup)
+            
+            # Extract results table
+            player_results = self.extract_results_table(soup)
         
-        # Extract results table
-        player_results = self.extract_results_table(soup)
+        if self.fragments_dir:
+            self.archive_fragments(file_path, headers, html_content, challenge_info)
         
         # Combine all data
         file_data = {
@@ -360,26 +663,214 @@ class GeoGuessrExtractor:
         
         return file_data
     
-    def process_all_files(self) -> List[Dict[str, Any]]:
-        """Process all mHTML files in the games folder"""
+    def archive_fragments(self, file_path: Path, headers: str, html_content: str, challenge_info: Dict[str, Any]):
+        """Keep what extraction needs from a page in the fragment archive
+        
+        Pages whose fragments cannot be located are kept whole, so nothing
+        is lost when the selectors need fixing.
+        """
+        fragments = self.extract_result_fragments(html_content)
+        # The page lines extract_challenge_info() matches, the rest of the page is not needed
+        matches = [pattern.search(html_content) for pattern in (DATE_RE, CHALLENGE_URL_RE, SUBJECT_RE)]
+        page_lines = [match.group(0) for match in sorted(filter(None, matches), key=lambda match: match.start())]
+        
+        record = {
+            'file_name': file_path.name,
+            'challenge_id': challenge_info['challenge_id'],
+            'challenge_date': challenge_info['challenge_date'],
+            'source': {
+                'archive': file_path.archive.name if isinstance(file_path, ArchiveMember) else None,
+                'index': file_path.index if isinstance(file_path, ArchiveMember) else None
+            },
+            'headers': headers,
+            'page_lines': page_lines,
+            'html': html_content if fragments is None else fragments,
+            'complete_page': fragments is None
+        }
+        try:
+            name = record_name(challenge_info['challenge_id'], file_path.name, per_save=not self.dedupe)
+            save_record(Path(self.fragments_dir), name, record)
+        except OSError as e:
+            print(f"Warning: Could not archive the fragments of {file_path}: {e}")
+    
+    def reextract_file(self, record_file: Path) -> Optional[Dict[str, Any]]:
+        """Extract a challenge again from its fragment archive record"""
+        record = load_record(record_file)
+        if record is None:
+            return None
+        save = ArchivedSave(record['file_name'])
+        
+        try:
+            with self.stage('parse', save.name, len(record['html'])):
+                soup = self.parse_html(record['html'])
+            
+            with self.stage('extract', save.name, len(record['html'])):
+                return {
+                    'challenge_info': self.extract_challenge_info('\n'.join(record['page_lines']), save,
+                                                                  record['headers']),
+                    'game_info': self.extract_game_info(soup),
+                    'player_results': self.extract_results_table(soup)
+                }
+        except Exception as e:
+            print(f"Error processing {save}: {e}")
+            return None
+    
+    def reextract_file_task(self, record_file: Path) -> Tuple[Optional[Dict[str, Any]], Optional[List[Dict[str, Any]]]]:
+        """Worker process entry point for reextract_file()"""
+        file_data = self.reextract_file(record_file)
+        return file_data, self.profiler.drain() if self.profiler else None
+    
+    def run_from_archive(self, output_file: str = "geoguessr_results.csv", fragments_dir: str = 'geoguessr_fragments'):
+        """Rebuild the output from the fragment archive alone, without the original files"""
+        print(f"Re-extracting GeoGuessr data from {fragments_dir}/...")
+        
+        folder = Path(fragments_dir)
+        record_files = list_records(folder, self.dedupe) if folder.is_dir() else []
+        if not record_files:
+            print(f"No fragment records found in '{folder}'")
+            return
+        print(f"Found {len(record_files)} archived challenges")
+        
+        wants_builder = self.aggregates_file or self.ratings_file
+        builder = AggregatesBuilder() if wants_builder and self.output_format == 'csv' else None
+        file_rows = ((record_file, self.flatten_file_data(file_data) if file_data else [])
+                     for record_file, file_data in self.map_files(self.reextract_file_task, record_files))
+        if self.output_format == 'sqlite':
+            # The archive is the whole truth, challenges without a record are dropped
+            games, records = self.stream_sqlite(file_rows, output_file, keep_files=set())
+        else:
+            games, records = self.stream_csv(file_rows, output_file, builder)
+        
+        if not games:
+            print("No data extracted")
+            return
+        
+        print(f"Data exported to {output_file}")
+        self.export_derived(None, output_file, builder)
+        
+        print(f"\nSummary:")
+        print(f"- Re-extracted {games} games")
+        print(f"- Total player records: {records}")
+    
+    def process_file_safe(self, file_path: Path) -> Optional[Dict[str, Any]]:
+        """Process a single file, turning any error into a skipped file"""
+        try:
+            return self.process_file(file_path)
+        except Exception as e:
+            print(f"Error processing {file_path}: {e}")
+            return None
+    
+    def process_file_task(self, file_path: Path) -> Tuple[Optional[Dict[str, Any]], Optional[List[Dict[str, Any]]]]:
+        """Worker process entry point, also returning the worker's profile records"""
+        file_data = self.process_file_safe(file_path)
+        return file_data, self.profiler.drain() if self.profiler else None
+    
+    def map_files(self, task, files: List[Path]) -> Iterator[Tuple[Path, Any]]:
+        """Run task(file_path) -> (result, profile records) over files, in parallel when possible
+        
+        Results are yielded in input order.
+        """
+        done = 0
+        if self.jobs > 1 and len(files) > 1:
+            workers = min(self.jobs, len(files))
+            # Forked workers must not share open archive handles with this process
+            close_archives()
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    # Only keep a few files per worker in flight, so results never pile up in memory
+                    in_flight = deque()
+                    submitted = 0
+                    while done < len(files):
+                        while submitted < len(files) and len(in_flight) < workers * IN_FLIGHT_PER_WORKER:
+                            in_flight.append(executor.submit(task, files[submitted]))
+                            submitted += 1
+                        result, records = in_flight.popleft().result()
+                        if records:
+                            self.profiler.records.extend(records)
+                        yield files[done], result
+                        done += 1
+            except BrokenProcessPool:
+                # A worker died hard (e.g. killed for memory), finish the batch in-process
+                print(f"Warning: Worker pool crashed, processing remaining {len(files) - done} files sequentially")
+        
+        for file_path in files[done:]:
+            result, records = task(file_path)
+            if records:
+                self.profiler.records.extend(records)
+            yield file_path, result
+        close_archives()
+    
+    def extract_files(self, files: List[Path]) -> Iterator[Tuple[Path, Optional[Dict[str, Any]]]]:
+        """Process files, in parallel when possible, yielding results in input order"""
+        return self.map_files(self.process_file_task, files)
+    
+    def iter_file_rows(self, files: List[Path]) -> Iterator[Tuple[Path, List[Dict[str, Any]]]]:
+        """Extract files one by one, yielding the flattened rows of each"""
+        for file_path, file_data in self.extract_files(files):
+            yield file_path, self.flatten_file_data(file_data) if file_data else []
+    
+    def list_mhtml_files(self) -> List[Path]:
+        """List mHTML files in the games folder in a stable order
+        
+        The games folder may also hold zip or tar archives of saves, or be
+        one. Their mHTML members follow the plain files, in archive order.
+        """
         if not self.games_folder.exists():
             print(f"Games folder '{self.games_folder}' does not exist!")
             return []
         
-        mhtml_files = list(self.games_folder.glob('*.mhtml'))
+        if self.games_folder.is_file():
+            mhtml_files, archives = [], [self.games_folder]
+        else:
+            mhtml_files = sorted(self.games_folder.glob('*.mhtml'))
+            archives = sorted(path for path in self.games_folder.iterdir() if path.is_file() and is_archive(path))
+        for archive in archives:
+            try:
+                mhtml_files.extend(list_archive_members(archive))
+            except Exception as e:
+                print(f"Error reading archive {archive}: {e}")
         if not mhtml_files:
             print(f"No mHTML files found in '{self.games_folder}'")
+        
+        return mhtml_files
+    
+    def process_all_files(self) -> List[Dict[str, Any]]:
+        """Process all mHTML files in the games folder"""
+        mhtml_files = self.list_mhtml_files()
+        if not mhtml_files:
             return []
         
         print(f"Found {len(mhtml_files)} mHTML files to process")
         
-        all_data = []
-        for file_path in mhtml_files:
-            file_data = self.process_file(file_path)
-            if file_data:
-                all_data.append(file_data)
+        return [file_data for _, file_data in self.extract_files(mhtml_files) if file_data]
+    
+    def flatten_file_data(self, file_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Turn the data of one file into CSV rows, one per player"""
+        challenge_info = file_data['challenge_info']
+        game_info = file_data['game_info']
         
-        return all_data
+        return [
+            {**challenge_info, **game_info, **player_result}
+            for player_result in file_data['player_results']
+        ]
+    
+    def write_csv(self, rows: List[Dict[str, Any]], output_file: str):
+        """Write already flattened rows to a CSV file"""
+        with self.stage('export', output_file):
+            with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=CSV_COLUMNS)
+                writer.writeheader()
+                writer.writerows(rows)
+        
+        if self.profiler is not None:
+            self.profiler.records[-1]['bytes'] = os.path.getsize(output_file)
+    
+    def append_csv(self, rows: List[Dict[str, Any]], output_file: str):
+        """Append flattened rows to an existing CSV file"""
+        with self.stage('export', output_file):
+            with open(output_file, 'a', newline='', encoding='utf-8') as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=CSV_COLUMNS)
+                writer.writerows(rows)
     
     def export_to_csv(self, data: List[Dict[str, Any]], output_file: str = "geoguessr_results.csv"):
         """Export extracted data to CSV format"""
@@ -389,70 +880,720 @@ class GeoGuessrExtractor:
         
         # Flatten the data for CSV export
         flattened_data = []
-        
         for file_data in data:
-            challenge_info = file_data['challenge_info']
-            game_info = file_data['game_info']
-            
-            for player_result in file_data['player_results']:
-                row = {
-                    **challenge_info,
-                    **game_info,
-                    **player_result
-                }
-                flattened_data.append(row)
-        
-        # Define CSV columns
-        columns = [
-            'file_name', 'challenge_id', 'challenge_date', 'challenge_title',
-            'map_name', 'map_creator', 'game_settings', 'time_limit', 'movement', 'panning', 'zooming',
-            'position', 'player_name',
-            'round_1_points', 'round_1_duration', 'round_1_steps',
-            'round_2_points', 'round_2_duration', 'round_2_steps',
-            'round_3_points', 'round_3_duration', 'round_3_steps',
-            'round_4_points', 'round_4_duration', 'round_4_steps',
-            'round_5_points', 'round_5_duration', 'round_5_steps',
-            'total_points', 'total_duration', 'total_steps'
-        ]
+            flattened_data.extend(self.flatten_file_data(file_data))
         
-        # Write to CSV
-        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=columns)
-            writer.writeheader()
-            writer.writerows(flattened_data)
+        self.write_csv(flattened_data, output_file)
         
         print(f"Data exported to {output_file}")
         print(f"Total records: {len(flattened_data)}")
     
-    def run(self, output_file: str = "geoguessr_results.csv"):
+    def write_sqlite(self, rows: List[Dict[str, Any]], output_file: str, removed_files: List[str] = (),
+                     removed_challenges: List[str] = ()) -> int:
+        """Upsert flattened rows into a SQLite database, dropping challenges of removed files first"""
+        with self.stage('export', output_file):
+            with SQLiteResultsStore(output_file) as store:
+                store.delete_files(removed_files)
+                store.delete_challenges(removed_challenges)
+                written = store.upsert_rows(rows)
+        
+        if self.profiler is not None:
+            self.profiler.records[-1]['bytes'] = os.path.getsize(output_file)
+        return written
+    
+    def write_sqlite_changes(self, output_file: str, entries: Dict[str, Any], old_entries: Dict[str, Any],
+                             pending_names: set, stale_files: List[str]) -> int:
+        """Write the rows of re-extracted files and drop those of stale ones
+        
+        A challenge may be stored from another save than the stale file, so
+        the challenges of stale files are dropped by ID and rewritten from the
+        files that still hold them.
+        """
+        stale_ids = {challenge_key(row) for name in stale_files for row in old_entries.get(name, {}).get('rows', [])}
+        rows = [row for name, entry in entries.items() for row in entry['rows']
+                if name in pending_names or challenge_key(row) in stale_ids]
+        return self.write_sqlite(rows, output_file, stale_files, sorted(stale_ids))
+    
+    def export_to_sqlite(self, data: List[Dict[str, Any]], output_file: str = "geoguessr_results.db"):
+        """Export extracted data to a SQLite database, updating games that are already stored"""
+        if not data:
+            print("No data to export")
+            return
+        
+        rows = [row for file_data in data for row in self.flatten_file_data(file_data)]
+        written = self.write_sqlite(rows, output_file)
+        
+        print(f"Data exported to {output_file}")
+        print(f"Records upserted: {written}")
+    
+    def export_derived(self, rows: Optional[List[Dict[str, Any]]], output_file: str,
+                       builder: Optional[AggregatesBuilder] = None):
+        """Write the files derived from the full set of results
+        
+        rows are all the results, or None to read them back from the output
+        (a builder already fed with them saves doing that for the aggregates).
+        """
+        if self.output_format == 'sqlite' or rows is None:
+            # The database may hold games from earlier runs, so derive from all of it
+            rows_source = lambda: self.output_rows(output_file)
+        else:
+            rows_source = lambda: rows
+        
+        if self.aggregates_file or self.ratings_file:
+            if builder is not None and self.output_format == 'csv':
+                aggregates = builder.result()
+            else:
+                aggregates = build_aggregates(rows_source())
+            
+            if self.aggregates_file:
+                save_aggregates(aggregates, self.aggregates_file)
+                print(f"Aggregates written to {self.aggregates_file}")
+            if self.ratings_file:
+                # Ratings only apply the challenges they have not seen yet
+                update_ratings(aggregates, self.ratings_file)
+        
+        if self.shard_by:
+            manifest = write_shards(rows_source, CSV_COLUMNS, self.shard_by, self.shards_dir)
+            print(f"Shards written to {self.shards_dir}/ ({len(manifest['shards'])} shards)")
+        
+        if self.fragments_dir and Path(self.fragments_dir).is_dir():
+            # Kept current here, so re-extraction can order and dedupe the records from the index alone
+            index_records(Path(self.fragments_dir))
+    
+    def output_rows(self, output_file: str) -> Iterator[Dict[str, Any]]:
+        """Read all rows back from the output, lazily"""
+        if self.output_format == 'sqlite':
+            with SQLiteResultsStore(output_file) as store:
+                yield from store.fetch_rows()
+            return
+        
+        with open(output_file, 'r', newline='', encoding='utf-8') as f:
+            yield from csv.DictReader(f)
+    
+    @staticmethod
+    def sync(f):
+        """Push buffered output all the way to disk"""
+        f.flush()
+        os.fsync(f.fileno())
+    
+    def stream_csv(self, file_rows: Iterator[Tuple[Path, List[Dict[str, Any]]]], output_file: str,
+                   builder: Optional[AggregatesBuilder] = None, append: bool = False) -> Tuple[int, int]:
+        """Write rows to a CSV file as files are extracted, returns (games, records) written
+        
+        The rows of a file are written together and the CSV is flushed to disk
+        every FLUSH_EVERY_FILES files or FLUSH_EVERY_SECONDS, so an interrupted
+        run leaves a valid CSV of the files finished so far.
+        """
+        games = records = 0
+        with open(output_file, 'a' if append else 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_COLUMNS)
+            if not append:
+                writer.writeheader()
+            
+            unflushed = 0
+            last_flush = time.monotonic()
+            for file_path, rows in file_rows:
+                if not rows:
+                    continue
+                with self.stage('export', file_path.name):
+                    writer.writerows(rows)
+                if builder is not None:
+                    builder.add_rows(rows)
+                games += 1
+                records += len(rows)
+                
+                unflushed += 1
+                if unflushed >= FLUSH_EVERY_FILES or time.monotonic() - last_flush >= FLUSH_EVERY_SECONDS:
+                    self.sync(csvfile)
+                    unflushed = 0
+                    last_flush = time.monotonic()
+            
+            self.sync(csvfile)
+        return games, records
+    
+    def stream_sqlite(self, file_rows: Iterator[Tuple[Path, List[Dict[str, Any]]]], output_file: str,
+                      keep_files: Optional[set] = None) -> Tuple[int, int]:
+        """Upsert rows into a SQLite database as files are extracted, returns (games, records) written
+        
+        Rows are committed in batches of FLUSH_EVERY_FILES files or FLUSH_EVERY_SECONDS,
+        each batch in its own transaction. With keep_files, challenges of files that
+        are neither in keep_files nor written now are deleted once all rows are in.
+        """
+        games = records = 0
+        written_files = set()
+        with SQLiteResultsStore(output_file) as store:
+            batch = []
+            batch_files = 0
+            last_flush = time.monotonic()
+            for file_path, rows in file_rows:
+                if rows:
+                    batch.extend(rows)
+                    batch_files += 1
+                    games += 1
+                    # Rows carry the save's name, also when file_path is a fragment record
+                    written_files.add(rows[0]['file_name'])
+                if batch and (batch_files >= FLUSH_EVERY_FILES or time.monotonic() - last_flush >= FLUSH_EVERY_SECONDS):
+                    with self.stage('export', output_file):
+                        records += store.upsert_rows(batch)
+                    batch, batch_files = [], 0
+                    last_flush = time.monotonic()
+            
+            if batch:
+                with self.stage('export', output_file):
+                    records += store.upsert_rows(batch)
+            
+            if keep_files is not None:
+                # Saves deleted since the database was last written
+                removed = store.delete_files(store.file_names() - keep_files - written_files)
+                if removed:
+                    print(f"Removed {removed} challenges whose files are gone")
+        return games, records
+    
+    def resume_csv(self, output_file: str, builder: Optional[AggregatesBuilder] = None) -> Optional[Tuple[set, int]]:
+        """Prepare the partial CSV of an interrupted run for appending
+        
+        Keeps the rows of every file that was written completely and cuts off
+        the last file, which may have been cut short. Returns the names of the
+        files that are done and the number of rows kept, or None when there is
+        no usable CSV to resume.
+        """
+        try:
+            f = open(output_file, 'rb')
+        except OSError:
+            return None
+        
+        with f:
+            offset = 0
+            
+            def lines():
+                nonlocal offset
+                for line in f:
+                    offset += len(line)
+                    yield line.decode('utf-8', errors='replace')
+            
+            # The reader pulls one line at a time, so offset is always at the end of the last row read
+            reader = csv.reader(lines())
+            try:
+                if next(reader, None) != CSV_COLUMNS:
+                    return None
+            except csv.Error:
+                return None
+            
+            done = set()
+            kept = 0
+            file_name, file_rows, file_start = None, [], offset
+            while True:
+                row_start = offset
+                try:
+                    values = next(reader, None)
+                except csv.Error:
+                    break
+                if values is None or len(values) != len(CSV_COLUMNS):
+                    break
+                
+                if values[0] != file_name:
+                    # The previous file is followed by another one, so it was written completely
+                    if file_name is not None:
+                        done.add(file_name)
+                        kept += len(file_rows)
+                        if builder is not None:
+                            builder.add_rows(file_rows)
+                    file_name, file_rows, file_start = values[0], [], row_start
+                file_rows.append(dict(zip(CSV_COLUMNS, values)))
+        
+        os.truncate(output_file, file_start)
+        return done, kept
+    
+    def scan_file(self, file_path: Path, full: bool = False) -> Optional[Dict[str, Any]]:
+        """Cheap pass over a file: its challenge, save date and, with full, a fingerprint of its results
+        
+        Saves name their challenge in the MIME headers (Snapshot-Content-Location),
+        so usually only the header block is read. Otherwise, and with full, the
+        HTML part is decoded and scanned like extract_challenge_info() does, still
+        without HTML parsing. The fingerprint covers the results table and game
+        info markup, so two saves of the same results get the same fingerprint
+        even when the rest of the page differs. Only saves that share a challenge
+        need it, which leaves decoding every other file to the extraction.
+        """
+        try:
+            stat = file_path.stat()
+            with self.stage('scan', file_path.name, stat.st_size):
+                data = self.map_file(file_path)
+                try:
+                    headers = self.header_block(data)
+                    parts = None
+                    if full or not CHALLENGE_URL_RE.search(headers):
+                        parts = self.decode_mhtml(data)
+                        if parts is None:
+                            return None
+                finally:
+                    if isinstance(data, mmap.mmap):
+                        data.close()
+                
+                fragments = None
+                if parts:
+                    headers, html_content = parts
+                    challenge_info = self.extract_challenge_info(html_content, file_path, headers)
+                    fragments = self.extract_result_fragments(html_content) or html_content
+                else:
+                    challenge_info = self.extract_challenge_info(headers, file_path, headers)
+        except Exception as e:
+            print(f"Error scanning {file_path}: {e}")
+            return None
+        
+        saved_at = None
+        if challenge_info['challenge_date']:
+            saved_at = datetime.fromisoformat(challenge_info['challenge_date']).timestamp()
+        return {
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'challenge_id': challenge_info['challenge_id'],
+            'saved_at': saved_at,
+            'fingerprint': hashlib.sha256(fragments.encode('utf-8', errors='replace')).hexdigest() if fragments else None,
+            'results_size': len(fragments) if fragments else None
+        }
+    
+    def header_block(self, data: bytes) -> str:
+        """Top-level MIME header block of an mHTML file, '' when it does not start with one"""
+        header_end = self._find_blank_line(data[:MAX_HEADER_SIZE + 4], 0)
+        if header_end is None:
+            return ''
+        return data[:header_end[0]].decode('utf-8', errors='replace')
+    
+    def scan_file_task(self, file_path: Path) -> Tuple[Optional[Dict[str, Any]], Optional[List[Dict[str, Any]]]]:
+        """Worker process entry point for scan_file()"""
+        scan = self.scan_file(file_path)
+        return scan, self.profiler.drain() if self.profiler else None
+    
+    def full_scan_file_task(self, file_path: Path) -> Tuple[Optional[Dict[str, Any]], Optional[List[Dict[str, Any]]]]:
+        """Worker process entry point for scan_file() with fingerprints"""
+        scan = self.scan_file(file_path, full=True)
+        return scan, self.profiler.drain() if self.profiler else None
+    
+    @staticmethod
+    def challenge_index_path(output_file: str) -> Path:
+        """Location of the challenge dedup index that belongs to an output file"""
+        return Path(output_file).with_suffix('.challenges.json')
+    
+    def dedupe_files(self, files: List[Path], output_file: str, report: bool = True) -> List[Path]:
+        """Drop files that are another save of a challenge that is also saved elsewhere
+        
+        Saves of one challenge with the same results fingerprint are exact
+        duplicates. Otherwise the snapshot saved last wins, then the one with
+        more results markup, then the first file name, so the choice does not
+        depend on the order files are found in. Scans are cached in an index
+        next to the output, which also records what was collapsed into what.
+        """
+        if not self.dedupe or not files:
+            return files
+        
+        index_file = self.challenge_index_path(output_file)
+        index = {}
+        if index_file.exists():
+            try:
+                with open(index_file, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                if cached.get('version') == CHALLENGE_INDEX_VERSION:
+                    index = cached.get('files', {})
+            except (OSError, ValueError) as e:
+                print(f"Warning: Ignoring unreadable challenge index {index_file}: {e}")
+        
+        scans = {}
+        to_scan = []
+        present = []
+        for file_path in files:
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                # Deleted since the folder was listed
+                continue
+            present.append(file_path)
+            entry = index.get(file_path.name)
+            if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+                scans[file_path.name] = entry
+            else:
+                to_scan.append(file_path)
+        for file_path, scan in self.map_files(self.scan_file_task, to_scan):
+            if scan:
+                scans[file_path.name] = scan
+        
+        files = present
+        challenges = {}
+        for file_path in files:
+            scan = scans.get(file_path.name)
+            if scan and scan['challenge_id']:
+                challenges.setdefault(scan['challenge_id'], []).append(file_path.name)
+        
+        # Fingerprints are only needed to choose between saves of the same challenge
+        shared = {name for names in challenges.values() if len(names) > 1 for name in names}
+        to_fingerprint = [file_path for file_path in files
+                          if file_path.name in shared and scans[file_path.name]['fingerprint'] is None]
+        for file_path, scan in self.map_files(self.full_scan_file_task, to_fingerprint):
+            if scan:
+                scans[file_path.name] = {**scan, 'challenge_id': scans[file_path.name]['challenge_id']}
+        
+        duplicates = {}
+        for names in challenges.values():
+            if len(names) < 2:
+                continue
+            kept = min(names, key=lambda name: (-(scans[name]['saved_at'] or 0), -(scans[name]['results_size'] or 0),
+                                                name))
+            for name in names:
+                if name != kept:
+                    same = scans[name]['fingerprint'] is not None and \
+                        scans[name]['fingerprint'] == scans[kept]['fingerprint']
+                    duplicates[name] = {'kept': kept, 'reason': 'identical' if same else 'older snapshot'}
+        
+        tmp_file = index_file.with_name(index_file.name + '.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': CHALLENGE_INDEX_VERSION, 'files': scans, 'duplicates': duplicates}, f,
+                      ensure_ascii=False)
+        os.replace(tmp_file, index_file)
+        
+        self.duplicates = duplicates
+        if duplicates and report:
+            print(f"Collapsed {len(duplicates)} duplicate saves:")
+            for name, duplicate in sorted(duplicates.items()):
+                print(f"- {name} -> {duplicate['kept']} ({duplicate['reason']})")
+        
+        return [file_path for file_path in files if file_path.name not in duplicates]
+    
+    @staticmethod
+    def source_name(file_path: Path) -> str:
+        """Name of the file on disk that holds a file, the archive for archive members"""
+        return file_path.archive.name if isinstance(file_path, ArchiveMember) else file_path.name
+    
+    @staticmethod
+    def manifest_path(output_file: str) -> Path:
+        """Location of the incremental manifest that belongs to an output file"""
+        return Path(output_file).with_suffix('.manifest.json')
+    
+    @staticmethod
+    def file_hash(file_path: Path) -> str:
+        """SHA-256 of a file, read in chunks"""
+        digest = hashlib.sha256()
+        with file_path.open('rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def load_manifest(self, manifest_file: Path) -> Dict[str, Any]:
+        """Load the per-file manifest, or return an empty one"""
+        if not manifest_file.exists():
+            return {}
+        
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable manifest {manifest_file}: {e}")
+            return {}
+        
+        if manifest.get('version') != MANIFEST_VERSION:
+            print(f"Manifest {manifest_file} is from another version, re-extracting everything")
+            return {}
+        
+        return manifest.get('files', {})
+    
+    def save_manifest(self, manifest_file: Path, files: Dict[str, Any]):
+        """Atomically write the per-file manifest"""
+        tmp_file = manifest_file.with_name(manifest_file.name + '.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'files': files}, f, ensure_ascii=False)
+        os.replace(tmp_file, manifest_file)
+    
+    def run_incremental(self, output_file: str = "geoguessr_results.csv"):
+        """Re-extract only new or modified files and merge them into the output"""
+        print("Starting incremental GeoGuessr data extraction...")
+        
+        # Never wipe the output because the games folder is missing
+        if not self.games_folder.exists():
+            print(f"Games folder '{self.games_folder}' does not exist!")
+            return
+        
+        manifest_file = self.manifest_path(output_file)
+        old_entries = self.load_manifest(manifest_file)
+        if self.output_format == 'sqlite' and not Path(output_file).exists():
+            # The database is only updated with changes, so it has to start from everything
+            old_entries = {}
+        mhtml_files = self.dedupe_files(self.list_mhtml_files(), output_file)
+        
+        entries = {}
+        pending = []
+        unchanged = 0
+        for file_path in mhtml_files:
+            stat = file_path.stat()
+            entry = old_entries.get(file_path.name)
+            
+            # Cheap check first: same size and mtime means the file is untouched
+            if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+                entries[file_path.name] = entry
+                unchanged += 1
+                continue
+            
+            # Touched but possibly identical (copied, restored from backup, ...)
+            content_hash = self.file_hash(file_path)
+            if entry and entry['size'] == stat.st_size and entry['sha256'] == content_hash:
+                entries[file_path.name] = {**entry, 'mtime': stat.st_mtime_ns}
+                unchanged += 1
+                continue
+            
+            entries[file_path.name] = {
+                'size': stat.st_size,
+                'mtime': stat.st_mtime_ns,
+                'sha256': content_hash,
+                'rows': []
+            }
+            pending.append(file_path)
+        
+        for file_path, file_data in self.extract_files(pending):
+            if file_data:
+                entries[file_path.name]['rows'] = self.flatten_file_data(file_data)
+        
+        changed = len(pending)
+        removed_files = sorted(set(old_entries) - set(entries))
+        
+        rows = [row for entry in entries.values() for row in entry['rows']]
+        if self.output_format == 'sqlite':
+            # Only touch what changed: modified files are replaced, deleted ones dropped
+            stale_files = removed_files + [path.name for path in pending if path.name in old_entries]
+            self.write_sqlite_changes(output_file, entries, old_entries, {path.name for path in pending}, stale_files)
+        else:
+            self.write_csv(rows, output_file)
+        self.save_manifest(manifest_file, entries)
+        self.export_derived(rows, output_file)
+        
+        print(f"\nSummary:")
+        print(f"- Unchanged files skipped: {unchanged}")
+        print(f"- New or modified files extracted: {changed}")
+        print(f"- Deleted files dropped: {len(removed_files)}")
+        print(f"- Total player records: {len(rows)}")
+        print(f"Data exported to {output_file}")
+    
+    def apply_changes(self, output_file: str, changed: List[Path]):
+        """Bring the output up to date after files changed or were deleted"""
+        manifest_file = self.manifest_path(output_file)
+        old_entries = self.load_manifest(manifest_file)
+        entries = dict(old_entries)
+        
+        # A new save can replace another save of the same challenge, or be collapsed into it
+        mhtml_files = self.list_mhtml_files()
+        winners = self.dedupe_files(mhtml_files, output_file, report=False)
+        # A changed archive changes all of its members
+        changed_sources = {path.name for path in changed}
+        changed_names = {path.name for path in mhtml_files if self.source_name(path) in changed_sources}
+        
+        pending = []
+        for file_path in winners:
+            entry = entries.get(file_path.name)
+            if entry and file_path.name not in changed_names:
+                continue
+            stat = file_path.stat()
+            content_hash = self.file_hash(file_path)
+            if entry and entry['size'] == stat.st_size and entry['sha256'] == content_hash:
+                entries[file_path.name] = {**entry, 'mtime': stat.st_mtime_ns}
+                continue
+            pending.append((file_path, {'size': stat.st_size, 'mtime': stat.st_mtime_ns,
+                                        'sha256': content_hash, 'rows': []}))
+        
+        winner_names = {file_path.name for file_path in winners}
+        stale_files = [name for name in entries if name not in winner_names]
+        stale_files += [path.name for path, _ in pending if path.name in entries]
+        for name in stale_files:
+            entries.pop(name)
+        
+        new_rows = []
+        for (file_path, entry), (_, file_data) in zip(pending, self.extract_files([path for path, _ in pending])):
+            if file_data:
+                entry['rows'] = self.flatten_file_data(file_data)
+                new_rows.extend(entry['rows'])
+            entries[file_path.name] = entry
+        
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        for name in sorted(changed_names & set(self.duplicates)):
+            print(f"[{timestamp}] {name}: duplicate of {self.duplicates[name]['kept']}, skipped")
+        
+        if not pending and not stale_files:
+            self.save_manifest(manifest_file, entries)
+            return
+        
+        # Same order as a full run, so the aggregates come out the same
+        entries = dict(sorted(entries.items()))
+        rows = [row for entry in entries.values() for row in entry['rows']]
+        if self.output_format == 'sqlite':
+            self.write_sqlite_changes(output_file, entries, old_entries, {path.name for path, _ in pending}, stale_files)
+            self.export_derived(rows, output_file)
+        else:
+            # Aggregates go first, so a dashboard reacting to the new rows already finds them updated
+            self.export_derived(rows, output_file)
+            if stale_files or not Path(output_file).exists():
+                self.write_csv(rows, output_file)
+            else:
+                self.append_csv(new_rows, output_file)
+        self.save_manifest(manifest_file, entries)
+        
+        for file_path, entry in pending:
+            print(f"[{timestamp}] {file_path.name}: {len(entry['rows'])} records")
+        for name in stale_files:
+            if name in self.duplicates:
+                print(f"[{timestamp}] {name}: superseded by {self.duplicates[name]['kept']}")
+            elif name not in entries:
+                print(f"[{timestamp}] {name}: removed")
+    
+    def watch(self, output_file: str = "geoguessr_results.csv", debounce: float = 0.5):
+        """Extract new and modified files as soon as they are saved, until interrupted"""
+        if not self.games_folder.exists():
+            print(f"Games folder '{self.games_folder}' does not exist!")
+            return
+        
+        if not self.games_folder.is_dir():
+            print(f"Games folder '{self.games_folder}' is not a folder, --watch needs one")
+            return
+        
+        # Start watching first, so files saved while catching up are not missed
+        patterns = ('*.mhtml',) + tuple('*' + suffix for suffix in ARCHIVE_SUFFIXES)
+        watcher = FolderWatcher(self.games_folder, patterns=patterns, debounce=debounce)
+        self.run_incremental(output_file)
+        
+        print(f"\nWatching '{self.games_folder}' for new games ({watcher.mode}), press Ctrl+C to stop")
+        try:
+            for changed, _ in watcher.changes():
+                self.apply_changes(output_file, changed)
+        except KeyboardInterrupt:
+            print("\nStopped watching")
+        finally:
+            watcher.close()
+    
+    def run(self, output_file: str = "geoguessr_results.csv", incremental: bool = False, resume: bool = False):
         """Main method to run the extraction process"""
+        if incremental:
+            self.run_incremental(output_file)
+            return
+        
         print("Starting GeoGuessr data extraction...")
         
-        # Process all files
-        data = self.process_all_files()
+        mhtml_files = self.list_mhtml_files()
+        if not mhtml_files:
+            print("No data extracted")
+            return
+        print(f"Found {len(mhtml_files)} mHTML files to process")
+        listed_files = {file_path.name for file_path in mhtml_files}
+        mhtml_files = self.dedupe_files(mhtml_files, output_file)
         
-        if data:
-            # Export to CSV
-            self.export_to_csv(data, output_file)
-            
-            # Print summary
-            total_players = sum(len(file_data['player_results']) for file_data in data)
-            print(f"\nSummary:")
-            print(f"- Processed {len(data)} games")
-            print(f"- Total player records: {total_players}")
+        # CSV aggregates are built while the rows stream past, SQLite ones from the database
+        wants_builder = self.aggregates_file or self.ratings_file
+        builder = AggregatesBuilder() if wants_builder and self.output_format == 'csv' else None
+        done, kept = set(), 0
+        resumed = self.resume_output(output_file, builder) if resume else None
+        if resumed is not None:
+            done, kept = resumed
+            print(f"Resuming {output_file}: {len(done)} files already extracted")
+            mhtml_files = [file_path for file_path in mhtml_files if file_path.name not in done]
+        
+        # Stream rows file by file straight into the output
+        file_rows = self.iter_file_rows(mhtml_files)
+        if self.output_format == 'sqlite':
+            games, records = self.stream_sqlite(file_rows, output_file, keep_files=listed_files)
         else:
+            games, records = self.stream_csv(file_rows, output_file, builder, append=resumed is not None)
+        
+        if not games and not done:
             print("No data extracted")
-
+            return
+        
+        print(f"Data exported to {output_file}")
+        self.export_derived(None, output_file, builder)
+        
+        # Print summary
+        print(f"\nSummary:")
+        print(f"- Processed {games} games")
+        if done:
+            print(f"- Kept from the interrupted run: {len(done)} games")
+        print(f"- Total player records: {records + kept}")
+    
+    def resume_output(self, output_file: str, builder: Optional[AggregatesBuilder] = None) -> Optional[Tuple[set, int]]:
+        """Files already in the output of an interrupted run, and their number of rows"""
+        if self.output_format == 'sqlite':
+            if not Path(output_file).exists():
+                return None
+            with SQLiteResultsStore(output_file) as store:
+                return store.file_names(), 0
+        return self.resume_csv(output_file, builder)
 
 def main():
     parser = argparse.ArgumentParser(description='Extract GeoGuessr data from mHTML files')
-    parser.add_argument('--games-folder', default='games', help='Folder containing mHTML files')
-    parser.add_argument('--output', default='geoguessr_results.csv', help='Output CSV file')
+    parser.add_argument('--games-folder', default='games',
+                        help='Folder containing mHTML files and/or zip or tar archives of them, or one archive')
+    parser.add_argument('--output', help='Output file (default: geoguessr_results.csv, or .db for SQLite)')
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default='csv',
+                        help='Write a flat CSV or upsert into a normalized SQLite database')
+    parser.add_argument('--aggregates', nargs='?', const='geoguessr_aggregates.json', metavar='PATH',
+                        help='Also write precomputed dashboard statistics to PATH (default geoguessr_aggregates.json)')
+    parser.add_argument('--ratings', nargs='?', const='geoguessr_ratings.json', metavar='PATH',
+                        help='Also keep player ratings and their history in PATH, updated incrementally '
+                             '(default geoguessr_ratings.json)')
+    parser.add_argument('--shards', type=parse_shard_by, metavar='BY',
+                        help="Also write the results as time shards for lazy dashboard loading, "
+                             "'month' or a number of challenges per shard")
+    parser.add_argument('--shards-dir', default='geoguessr_shards',
+                        help='Folder for the shards and their manifest.json (default: geoguessr_shards)')
+    parser.add_argument('--fragment-archive', nargs='?', const='geoguessr_fragments', metavar='DIR',
+                        help='Keep the results table and game info of every extracted challenge in DIR, '
+                             'a few KB each (default geoguessr_fragments)')
+    parser.add_argument('--reextract-from-archive', action='store_true',
+                        help='Rebuild the output from the fragment archive instead of the mHTML files')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only extract new or modified files, tracked in a manifest next to the output')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted run, keeping the files already in the output')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and extract new or modified files as soon as they are saved')
+    parser.add_argument('--debounce', type=float, default=0.5,
+                        help='Seconds a file must stop changing before --watch extracts it (default: 0.5)')
+    parser.add_argument('--keep-duplicates', action='store_true',
+                        help='Extract every save, even several saves of the same challenge')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Number of worker processes (default: number of CPUs, 1 disables parallelism)')
+    parser.add_argument('--parser', choices=PARSERS, default='fast',
+                        help="'fast' and 'lxml' only parse the results section, 'html.parser' parses the whole page")
+    parser.add_argument('--profile', nargs='?', const='geoguessr_profile.json', metavar='REPORT',
+                        help='Record per-stage timings and write them to REPORT (.json or .csv, '
+                             'default geoguessr_profile.json)')
+    parser.add_argument('--cprofile', metavar='FILE',
+                        help='Also write a cProfile dump of the main process to FILE')
     
     args = parser.parse_args()
+    if args.output is None:
+        args.output = 'geoguessr_results.db' if args.output_format == 'sqlite' else 'geoguessr_results.csv'
+    
+    extractor = GeoGuessrExtractor(args.games_folder, jobs=args.jobs, parser=args.parser,
+                                   output_format=args.output_format)
+    extractor.aggregates_file = args.aggregates
+    extractor.ratings_file = args.ratings
+    extractor.shard_by = args.shards
+    extractor.shards_dir = args.shards_dir
+    if not args.reextract_from_archive:
+        extractor.fragments_dir = args.fragment_archive
+    extractor.dedupe = not args.keep_duplicates
+    if args.profile:
+        extractor.profiler = StageProfiler()
+    
+    if args.reextract_from_archive:
+        extractor.run_from_archive(args.output, args.fragment_archive or 'geoguessr_fragments')
+    elif args.watch:
+        extractor.watch(args.output, debounce=args.debounce)
+    elif args.cprofile:
+        import cProfile
+        profile = cProfile.Profile()
+        profile.runcall(extractor.run, args.output, incremental=args.incremental, resume=args.resume)
+        profile.dump_stats(args.cprofile)
+        print(f"cProfile dump written to {args.cprofile}")
+    else:
+        extractor.run(args.output, incremental=args.incremental, resume=args.resume)
     
-    extractor = GeoGuessrExtractor(args.games_folder)
-    extractor.run(args.output)
+    if extractor.profiler:
+        extractor.profiler.print_summary()
+        extractor.profiler.write_report(args.profile)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+mHTML files inside zip and tar archives
+
+Lists the mHTML members of .zip, .tar, .tar.gz, .tar.bz2 and .tar.xz
+bundles and reads them straight from the archive, so shared or backed up
+saves can be extracted without unpacking them to disk first. A member is
+represented by an ArchiveMember, which the extractor uses wherever it
+would use the Path of a plain file; its name is 'archive!member'.
+
+Compressed tars can only be read front to back, so each process keeps its
+tars open and reads members in archive order: listing members in that
+order means every process decompresses an archive about once per pass.
+"""
+
+import fnmatch
+import tarfile
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, NamedTuple, BinaryIO
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+
+def is_archive(path: Path) -> bool:
+    """Whether a file name looks like a supported archive"""
+    return path.name.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+class MemberStat(NamedTuple):
+    """The parts of os.stat_result the extractor looks at"""
+    st_size: int
+    st_mtime_ns: int
+
+
+class ArchiveMember:
+    """An mHTML file inside an archive, used in place of a Path"""
+
+    def __init__(self, archive: Path, member: str, index: int, size: int, mtime_ns: int):
+        self.archive = archive
+        self.member = member
+        # Position in the archive, tar members are found by walking up to it
+        self.index = index
+        self.size = size
+        # Members change only when their archive does, so they share its mtime
+        self.mtime_ns = mtime_ns
+
+    @property
+    def name(self) -> str:
+        return f"{self.archive.name}!{self.member}"
+
+    def stat(self) -> MemberStat:
+        return MemberStat(self.size, self.mtime_ns)
+
+    def open(self, mode: str = 'rb') -> BinaryIO:
+        """Stream the member's bytes out of the archive"""
+        if mode != 'rb':
+            raise ValueError("Archive members can only be opened with mode 'rb'")
+        if self.archive.name.lower().endswith('.zip'):
+            return open_zip(self.archive).open(self.member)
+        return open_tar(self.archive).extract(self.index)
+
+    def read_bytes(self) -> bytes:
+        with self.open() as f:
+            return f.read()
+
+    def __str__(self) -> str:
+        return f"{self.archive}!{self.member}"
+
+    def __repr__(self) -> str:
+        return f"ArchiveMember({str(self)!r})"
+
+
+class TarCursor:
+    """An open tar archive read front to back, reopened to go backwards"""
+
+    def __init__(self, archive: Path):
+        self.archive = archive
+        self.tar = None
+        self.index = -1
+        self.info = None
+
+    def extract(self, index: int) -> BinaryIO:
+        if self.tar is None or index < self.index:
+            self.close()
+            self.tar = tarfile.open(self.archive, 'r:*')
+            self.index = -1
+        while self.index < index:
+            self.info = self.tar.next()
+            if self.info is None:
+                raise KeyError(f"{self.archive} has no member number {index}")
+            self.index += 1
+        return self.tar.extractfile(self.info)
+
+    def close(self):
+        if self.tar is not None:
+            self.tar.close()
+            self.tar = None
+
+
+# Archives opened by this process, kept open across members
+_open_archives: Dict[Path, object] = {}
+
+
+def open_zip(archive: Path) -> zipfile.ZipFile:
+    if archive not in _open_archives:
+        _open_archives[archive] = zipfile.ZipFile(archive)
+    return _open_archives[archive]
+
+
+def open_tar(archive: Path) -> TarCursor:
+    if archive not in _open_archives:
+        _open_archives[archive] = TarCursor(archive)
+    return _open_archives[archive]
+
+
+def close_archives():
+    """Close the archives this process has open"""
+    for opened in _open_archives.values():
+        opened.close()
+    _open_archives.clear()
+
+
+def list_archive_members(archive: Path, pattern: str = '*.mhtml') -> List[ArchiveMember]:
+    """Members of an archive whose file name matches pattern, in archive order"""
+    mtime_ns = archive.stat().st_mtime_ns
+    members = []
+    if archive.name.lower().endswith('.zip'):
+        with zipfile.ZipFile(archive) as zf:
+            for index, info in enumerate(zf.infolist()):
+                if not info.is_dir() and fnmatch.fnmatch(PurePosixPath(info.filename).name, pattern):
+                    members.append(ArchiveMember(archive, info.filename, index, info.file_size, mtime_ns))
+    else:
+        with tarfile.open(archive, 'r:*') as tar:
+            for index, info in enumerate(tar):
+                if info.isfile() and fnmatch.fnmatch(PurePosixPath(info.name).name, pattern):
+                    members.append(ArchiveMember(archive, info.name, index, info.size, mtime_ns))
+    return members
@@ -1,11 +1,50 @@
 #!/usr/bin/env python3
 """
-Check files for GitHub/Netlify publishing
+Check files for GitHub/Netlify publishing and build the dist/ folder
+
+The build writes everything a static host needs into dist/:
+- dashboard.html, minified
+- the results CSV, aggregates, ratings and time shards under
+  content-hashed names (e.g. geoguessr_results.3f2a9c1b0d.csv), written
+  into the dashboard's ASSETS block
+- Netlify _headers and _redirects files, with long-lived immutable caching
+  for the hashed files
 """
 
-import os
+import io
+import re
+import csv
+import sys
+import gzip
+import json
+import hashlib
+import argparse
 from pathlib import Path
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Data files the dashboard fetches, and whether publishing needs them
+DATA_FILES = {
+    "geoguessr_results.csv": True,
+    "geoguessr_aggregates.json": False,
+    "geoguessr_ratings.json": False
+}
+HASHED_CACHE_CONTROL = "public, max-age=31536000, immutable"
+HTML_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+# Written by the extractor's --shards option
+SHARDS_DIR = "geoguessr_shards"
+# The dashboard's table of data file names, replaced with the hashed names
+ASSETS_RE = re.compile(r'const ASSETS = \{.*?\};', re.S)
+SECURITY_HEADERS = {
+    "X-Frame-Options": "DENY",
+    "X-XSS-Protection": "1; mode=block",
+    "X-Content-Type-Options": "nosniff",
+    "Referrer-Policy": "strict-origin-when-cross-origin"
+}
+
 def check_publishing_files():
     """Check if all required files are present for GitHub/Netlify publishing"""
     
@@ -29,8 +68,15 @@ def check_publishing_files():
             missing_files.append(file_name)
             print(f"❌ {file_name}")
     
+    # Optional files are published when present
+    for file_name in [name for name, required in DATA_FILES.items() if not required] + [f"{SHARDS_DIR}/manifest.json"]:
+        if Path(file_name).exists():
+            print(f"✅ {file_name}")
+        else:
+            print(f"➖ {file_name} (optional, not found)")
+    
     print(f"\n📊 Status:")
-    print(f"   Present: {len(present_files)}/{len(required_files)} files")
+    print(f"   Present: {len(present_files)}/{len(required_files)} required files")
     
     if missing_files:
         print(f"   Missing: {', '.join(missing_files)}")
@@ -41,9 +87,9 @@ def check_publishing_files():
     
     print(f"\n🎉 All files ready for GitHub/Netlify!")
     print(f"\n📋 Next steps:")
-    print(f"   1. Files are already in your GitHub repository")
-    print(f"   2. Connect your GitHub repo to Netlify")
-    print(f"   3. Set publish directory to '/' (root)")
+    print(f"   1. Run 'python3 prepare_publish.py' to build the dist/ folder")
+    print(f"   2. Drag dist/ onto Netlify Drop, or connect your GitHub repo to Netlify")
+    print(f"   3. With GitHub, netlify.toml builds dist/ and publishes it")
     print(f"   4. Netlify will automatically deploy from GitHub")
     
     print(f"\n🌐 Your dashboard will be available at:")
@@ -51,5 +97,189 @@ def check_publishing_files():
     
     return True
 
+def minify_css(css):
+    """Drop comments and the whitespace CSS does not need"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+def minify_js(js):
+    """Drop indentation, blank lines and whole-line // comments
+
+    Line breaks are kept, so automatic semicolon insertion still works.
+    """
+    lines = (line.strip() for line in js.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+def minify_html(html):
+    """Minify the markup, inline styles and inline scripts of a page"""
+    parts = []
+    position = 0
+    for match in re.finditer(r'(<(script|style)[^>]*>)(.*?)(</\2>)', html, flags=re.S | re.I):
+        parts.append(minify_markup(html[position:match.start()]))
+        body = minify_css(match.group(3)) if match.group(2).lower() == 'style' else minify_js(match.group(3))
+        parts.append(match.group(1) + body + match.group(4))
+        position = match.end()
+    parts.append(minify_markup(html[position:]))
+    return ''.join(parts)
+
+def minify_markup(markup):
+    """Drop comments and collapse whitespace runs to a single space
+
+    Whitespace between tags is kept as one space, since it separates inline
+    elements (e.g. "<b>3</b> <span>pts</span>") when rendered.
+    """
+    markup = re.sub(r'<!--.*?-->', '', markup, flags=re.S)
+    return re.sub(r'\s+', ' ', markup)
+
+def compact_csv(text):
+    """Rewrite the CSV with trimmed values and bare newlines (the dashboard trims values anyway)"""
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator='\n')
+    for row in csv.reader(io.StringIO(text)):
+        writer.writerow([value.strip() for value in row])
+    return output.getvalue()
+
+def hashed_name(file_name, data):
+    """file.ext -> file.<hash>.ext, so the name changes whenever the content does"""
+    path = Path(file_name)
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    return f"{path.stem}.{digest}{path.suffix}"
+
+def is_hashed_file(file_name):
+    """Whether a file name is one hashed_name() gives a data file, or a compressed variant older builds wrote"""
+    for data_file in DATA_FILES:
+        path = Path(data_file)
+        if re.fullmatch(rf'{re.escape(path.stem)}\.[0-9a-f]{{10}}{re.escape(path.suffix)}(\.gz|\.br)?', file_name):
+            return True
+    return False
+
+def write_file(dist, file_name, data):
+    """Write a file, returns its size and what it compresses to with gzip and brotli
+    
+    Netlify compresses responses itself and never serves .gz or .br
+    siblings, so the compressed sizes are only reported.
+    """
+    (dist / file_name).write_bytes(data)
+    sizes = {'raw': len(data), 'gz': len(gzip.compress(data, compresslevel=9, mtime=0))}
+    if brotli:
+        sizes['br'] = len(brotli.compress(data, quality=11))
+    return sizes
+
+def netlify_headers(hashed_files):
+    """_headers file for dist/: immutable caching for hashed files, revalidation for the page"""
+    lines = ['/*']
+    lines += [f'  {name}: {value}' for name, value in SECURITY_HEADERS.items()]
+    
+    for path, cache_control in [('/', HTML_CACHE_CONTROL), ('/dashboard.html', HTML_CACHE_CONTROL)] + \
+            [(f'/{name}', HASHED_CACHE_CONTROL) for name in hashed_files]:
+        lines += [path, f'  Cache-Control: {cache_control}']
+    return '\n'.join(lines) + '\n'
+
+def netlify_redirects():
+    """_redirects file for dist/: serve the dashboard at the site root"""
+    return '/ /dashboard.html 200\n'
+
+def build_shards(dist, manifest_file, sizes):
+    """Copy the time shards under content-hashed names, returns the hashed manifest's name"""
+    shards_dist = dist / SHARDS_DIR
+    shards_dist.mkdir(exist_ok=True)
+    for old_file in shards_dist.iterdir():
+        if old_file.is_file():
+            old_file.unlink()
+    
+    manifest = json.loads(manifest_file.read_text(encoding='utf-8'))
+    for shard in manifest['shards']:
+        source = manifest_file.parent / shard['file']
+        data = compact_csv(source.read_text(encoding='utf-8')).encode('utf-8')
+        shard['file'] = hashed_name(shard['file'], data)
+        sizes[f"{SHARDS_DIR}/{shard['file']}"] = (source.stat().st_size, write_file(shards_dist, shard['file'], data))
+    
+    data = json.dumps(manifest, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    name = hashed_name("manifest.json", data)
+    sizes[f"{SHARDS_DIR}/{name}"] = (manifest_file.stat().st_size, write_file(shards_dist, name, data))
+    return name
+
+def build_dist(dist_dir="dist"):
+    """Write the minified and content-hashed site to dist_dir"""
+    dist = Path(dist_dir)
+    dist.mkdir(parents=True, exist_ok=True)
+    # Hashed files from earlier builds are never referenced again
+    for old_file in dist.iterdir():
+        if old_file.is_file() and (is_hashed_file(old_file.name) or old_file.name.startswith("dashboard.html.")):
+            old_file.unlink()
+    
+    print(f"\n📦 Building {dist}/")
+    html = minify_html(Path("dashboard.html").read_text(encoding='utf-8'))
+    blocks = ASSETS_RE.findall(html)
+    if len(blocks) != 1:
+        print("❌ dashboard.html needs exactly one 'const ASSETS = {...};' block for the file names")
+        return False
+    listed = re.findall(r"'([^']+)'\s*:", blocks[0])
+    # Files that are not published keep their plain names and are simply not found
+    assets = {name: name for name in listed}
+    sizes = {}
+    hashed_files = []
+    
+    for file_name, required in DATA_FILES.items():
+        source = Path(file_name)
+        if not source.exists():
+            if required:
+                print(f"❌ {file_name} is missing")
+                return False
+            print(f"⚠️  {file_name} not found, skipped")
+            continue
+        
+        if source.suffix == '.csv':
+            data = compact_csv(source.read_text(encoding='utf-8')).encode('utf-8')
+        else:
+            data = source.read_bytes()
+        name = hashed_name(file_name, data)
+        assets[file_name] = name
+        sizes[name] = (source.stat().st_size, write_file(dist, name, data))
+        hashed_files.append(name)
+    
+    manifest_file = Path(SHARDS_DIR) / "manifest.json"
+    if manifest_file.exists():
+        name = build_shards(dist, manifest_file, sizes)
+        assets[manifest_file.as_posix()] = f"{SHARDS_DIR}/{name}"
+        hashed_files.append(f"{SHARDS_DIR}/*")
+    
+    unknown = [name for name in assets if name not in listed]
+    if unknown:
+        print(f"❌ dashboard.html's ASSETS block does not list {', '.join(unknown)}")
+        return False
+    html = ASSETS_RE.sub(lambda match: f"const ASSETS = {json.dumps(assets, ensure_ascii=False)};", html)
+    sizes["dashboard.html"] = (Path("dashboard.html").stat().st_size,
+                               write_file(dist, "dashboard.html", html.encode('utf-8')))
+    # Netlify only reads netlify.toml from the repository root, not from the publish directory
+    (dist / "netlify.toml").unlink(missing_ok=True)
+    (dist / "_headers").write_text(netlify_headers(hashed_files), encoding='utf-8')
+    (dist / "_redirects").write_text(netlify_redirects(), encoding='utf-8')
+    
+    print(f"{'File':<50} {'Source':>10} {'Built':>10} {'gzip':>10} {'brotli':>10}")
+    for name, (source_size, variant_sizes) in sizes.items():
+        br = f"{variant_sizes['br']:,}" if 'br' in variant_sizes else '-'
+        print(f"{name:<50} {source_size:>10,} {variant_sizes['raw']:>10,} {variant_sizes['gz']:>10,} {br:>10}")
+    if not brotli:
+        print("ℹ️  Install the brotli package to also report brotli sizes")
+    
+    print(f"\n🎉 {dist}/ is ready: drag it onto Netlify Drop, or set it as the publish directory")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Check and build the dashboard for publishing')
+    parser.add_argument('--dist', default='dist', help='Output folder for the built site (default: dist)')
+    parser.add_argument('--check-only', action='store_true', help='Only check that the files are present')
+    args = parser.parse_args()
+    
+    if not check_publishing_files():
+        sys.exit(1)
+    # A failed build must fail the Netlify deploy too
+    if not args.check_only and not build_dist(args.dist):
+        sys.exit(1)
+
 if __name__ == "__main__":
-    check_publishing_files()
+    main()
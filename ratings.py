@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Incremental Elo ratings for GeoGuessr players
+
+Every challenge is scored as a round robin: each pair of players in it is
+a match won by the better position. Ratings are applied in challenge date
+order and saved together with a checkpoint (the last challenge applied),
+so later runs only apply challenges newer than the checkpoint. Ratings are
+replayed from the start only when an older challenge is backfilled, or an
+applied one changed or disappeared.
+
+The same file holds each player's rating after every game they played, so
+the dashboard can plot the history as is.
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+RATINGS_VERSION = 1
+INITIAL_RATING = 1500
+K_FACTOR = 32
+SCALE = 400
+
+
+def challenge_results(aggregates: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-challenge positions and points from the aggregates, in rating order
+
+    Challenges are keyed by their id (the file name when there is none), so
+    another save of the same challenge does not count as a new game: only
+    the first save in rating order is kept.
+    """
+    challenges = aggregates.get('challenges', {})
+    entries = []
+    for game in aggregates.get('time_series', []):
+        key = challenges.get(game['game'], {}).get('challenge_id') or game['game']
+        entries.append({'key': key, 'date': game['date'] or '', 'label': game['label'],
+                        'results': game['results']})
+    entries.sort(key=lambda entry: (entry['date'], entry['key']))
+    seen = set()
+    unique = []
+    for entry in entries:
+        if entry['key'] not in seen:
+            seen.add(entry['key'])
+            unique.append(entry)
+    return unique
+
+
+def results_digest(results: Dict[str, List[int]]) -> str:
+    """Short fingerprint of a challenge's results, to notice when they change"""
+    data = json.dumps(sorted(results.items()), ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]
+
+
+def match_score(a: List[int], b: List[int]) -> float:
+    """1, 0.5 or 0 for player a against player b, from [position, points]"""
+    if a[0] and b[0] and a[0] != b[0]:
+        return 1.0 if a[0] < b[0] else 0.0
+    if a[1] != b[1]:
+        return 1.0 if a[1] > b[1] else 0.0
+    return 0.5
+
+
+class RatingEngine:
+    """Elo ratings with the checkpoint and history needed to continue them"""
+
+    def __init__(self, state: Optional[Dict[str, Any]] = None):
+        state = state or {}
+        self.players: Dict[str, Dict[str, Any]] = state.get('players', {})
+        self.challenges: List[Dict[str, Any]] = state.get('challenges', [])
+        self.applied: Dict[str, str] = state.get('applied', {})
+        self.checkpoint: Optional[Tuple[str, str]] = tuple(state['checkpoint']) if state.get('checkpoint') else None
+
+    def apply(self, entry: Dict[str, Any]):
+        """Update ratings with one challenge, which must be newer than the checkpoint"""
+        results = entry['results']
+        names = list(results)
+        before = {name: self.players.get(name, {}).get('rating', INITIAL_RATING) for name in names}
+
+        deltas = {}
+        for name in names:
+            total = 0.0
+            for other in names:
+                if other != name:
+                    expected = 1 / (1 + 10 ** ((before[other] - before[name]) / SCALE))
+                    total += match_score(results[name], results[other]) - expected
+            deltas[name] = K_FACTOR * total / (len(names) - 1) if len(names) > 1 else 0.0
+
+        index = len(self.challenges)
+        self.challenges.append({'challenge': entry['key'], 'label': entry['label'], 'date': entry['date'] or None})
+        for name in names:
+            rating = round(before[name] + deltas[name], 1)
+            player = self.players.setdefault(name, {'rating': INITIAL_RATING, 'games': 0, 'peak': INITIAL_RATING,
+                                                    'history': []})
+            player['rating'] = rating
+            player['games'] += 1
+            player['peak'] = max(player['peak'], rating)
+            player['history'].append([index, rating, round(deltas[name], 1)])
+
+        self.applied[entry['key']] = results_digest(results)
+        self.checkpoint = (entry['date'], entry['key'])
+
+    def needs_replay(self, entries: List[Dict[str, Any]]) -> bool:
+        """Whether the entries can not simply be appended after the checkpoint"""
+        current = {}
+        for entry in entries:
+            current[entry['key']] = entry
+            if entry['key'] not in self.applied and self.checkpoint and (entry['date'], entry['key']) <= self.checkpoint:
+                return True
+        for key, digest in self.applied.items():
+            if key not in current or results_digest(current[key]['results']) != digest:
+                return True
+        return False
+
+    def update(self, entries: List[Dict[str, Any]]) -> Tuple[int, bool]:
+        """Bring ratings up to date with entries in rating order, returns (applied, replayed)"""
+        replayed = self.needs_replay(entries)
+        if replayed:
+            self.players, self.challenges, self.applied, self.checkpoint = {}, [], {}, None
+        applied = 0
+        for entry in entries:
+            # Checked per entry, so a key repeated within the batch is only applied once
+            if entry['key'] not in self.applied:
+                self.apply(entry)
+                applied += 1
+        return applied, replayed
+
+    def state(self) -> Dict[str, Any]:
+        leaderboard = sorted(self.players, key=lambda name: -self.players[name]['rating'])
+        return {
+            'version': RATINGS_VERSION,
+            'settings': {'initial': INITIAL_RATING, 'k': K_FACTOR, 'scale': SCALE},
+            'checkpoint': list(self.checkpoint) if self.checkpoint else None,
+            'applied': self.applied,
+            'leaderboard': leaderboard,
+            'players': self.players,
+            'challenges': self.challenges
+        }
+
+
+def load_ratings(ratings_file: str) -> Optional[Dict[str, Any]]:
+    """Saved rating state, None when missing, unreadable or made with other settings"""
+    path = Path(ratings_file)
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Ignoring unreadable ratings {ratings_file}: {e}")
+        return None
+    if state.get('version') != RATINGS_VERSION or \
+            state.get('settings') != {'initial': INITIAL_RATING, 'k': K_FACTOR, 'scale': SCALE}:
+        return None
+    return state
+
+
+def save_ratings(state: Dict[str, Any], ratings_file: str):
+    """Atomically write the rating state as compact JSON"""
+    tmp_file = Path(ratings_file).with_name(Path(ratings_file).name + '.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_file, ratings_file)
+
+
+def update_ratings(aggregates: Dict[str, Any], ratings_file: str = "geoguessr_ratings.json") -> RatingEngine:
+    """Apply the challenges newer than the saved checkpoint and save the ratings"""
+    engine = RatingEngine(load_ratings(ratings_file))
+    applied, replayed = engine.update(challenge_results(aggregates))
+    if applied or replayed or not Path(ratings_file).exists():
+        save_ratings(engine.state(), ratings_file)
+    if replayed:
+        print(f"Ratings replayed over {applied} challenges")
+    else:
+        print(f"Ratings updated with {applied} new challenges")
+    return engine
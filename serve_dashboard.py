@@ -1,51 +1,407 @@
 #!/usr/bin/env python3
 """
 Simple HTTP server to serve the GeoGuessr dashboard locally
+
+By default files are served by a threaded server that keeps them in memory,
+compresses text with gzip (or uses a pre-compressed .gz next to the file),
+sends strong ETags and answers If-None-Match with 304. Cached files are
+re-read as soon as they change on disk, e.g. when the extractor rewrites
+the CSV. Filtered statistics are served under /api/ (see dashboard_api.py),
+and /events streams rows appended to the CSV to open dashboards.
+Use --simple for the plain single-threaded server.
 """
 
+import io
+import csv
+import gzip
+import json
+import time
+import hashlib
+import argparse
+import functools
 import http.server
 import socketserver
+import threading
 import webbrowser
 import os
 from pathlib import Path
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from dashboard_api import DashboardAPI
+
+# Types worth compressing
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+
+# Files that change whenever the extractor runs must be revalidated on every use
+REVALIDATE_SUFFIXES = ('.html', '.csv', '.json')
+STATIC_MAX_AGE = 3600
+
+# Memory the file cache may use for file contents and their gzip variants
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# How often /events checks the CSV, and how often it sends a keep-alive comment
+EVENTS_POLL_INTERVAL = 0.25
+EVENTS_KEEPALIVE = 15
+
+
+class CachedFile:
+    """A file's contents, its gzip variant and their ETags"""
+
+    def __init__(self, stat: os.stat_result, body: bytes, gzip_body: Optional[bytes], content_type: str):
+        self.key = (stat.st_mtime_ns, stat.st_size)
+        self.body = body
+        self.gzip_body = gzip_body
+        self.size = len(body) + len(gzip_body or b'')
+        self.content_type = content_type
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+
+
+class FileCache:
+    """In-memory file cache, validated against the file's mtime and size on every lookup
+
+    Holds at most max_bytes of contents, evicting the least recently used
+    files first. Files larger than that are served without being kept.
+    """
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES):
+        self.files: "OrderedDict[str, CachedFile]" = OrderedDict()
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, path: str, content_type: str) -> Optional[CachedFile]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        with self.lock:
+            cached = self.files.get(path)
+            if cached and cached.key == (stat.st_mtime_ns, stat.st_size):
+                self.files.move_to_end(path)
+                return cached
+
+        with open(path, 'rb') as f:
+            body = f.read()
+
+        gzip_body = None
+        if content_type.startswith(COMPRESSIBLE_TYPES):
+            gzip_body = self.read_precompressed(path, stat) or gzip.compress(body, compresslevel=6)
+            if len(gzip_body) >= len(body):
+                gzip_body = None
+
+        cached = CachedFile(stat, body, gzip_body, content_type)
+        # Don't keep a file that was being rewritten while we read it
+        if (os.stat(path).st_mtime_ns, len(body)) == cached.key and cached.size <= self.max_bytes:
+            self.store(path, cached)
+        return cached
+
+    def store(self, path: str, cached: CachedFile):
+        """Keep a file, evicting the least recently used ones to stay within max_bytes"""
+        with self.lock:
+            old = self.files.pop(path, None)
+            if old is not None:
+                self.size -= old.size
+            while self.files and self.size + cached.size > self.max_bytes:
+                _, evicted = self.files.popitem(last=False)
+                self.size -= evicted.size
+            self.files[path] = cached
+            self.size += cached.size
+
+    @staticmethod
+    def read_precompressed(path: str, stat: os.stat_result) -> Optional[bytes]:
+        """Contents of an up to date path.gz, if there is one"""
+        try:
+            if os.stat(path + '.gz').st_mtime_ns < stat.st_mtime_ns:
+                return None
+            with open(path + '.gz', 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+class CSVTail:
+    """Follows a CSV file and reports rows appended to it, or that it was rewritten"""
+
+    # Bytes before the read position that must be unchanged for growth to count as an append
+    CHECK_SIZE = 256
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rewritten = False
+        self.reset()
+
+    def reset(self):
+        """Start following from the current end of the file"""
+        self.offset, self.tail, self.key, self.columns = 0, b'', None, []
+        try:
+            with open(self.path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                header = f.readline()
+                f.seek(max(0, stat.st_size - self.CHECK_SIZE))
+                self.tail = f.read(stat.st_size)
+        except OSError:
+            return
+        self.offset = stat.st_size
+        self.key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        self.columns = next(csv.reader([header.decode('utf-8-sig')]), [])
+
+    def poll(self) -> Optional[Tuple[str, Optional[List[Dict[str, str]]]]]:
+        """('rows', new rows), ('reload', None) once the file was rewritten, or None"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if key == self.key:
+            if self.rewritten:
+                # Only announce a rewrite once the writer is done with the file
+                self.rewritten = False
+                self.reset()
+                return 'reload', None
+            return None
+
+        previous_key, self.key = self.key, key
+        if self.rewritten:
+            return None
+        if not self.columns or previous_key is None or stat.st_ino != previous_key[0] or stat.st_size <= self.offset:
+            self.rewritten = True
+            return None
+
+        start = self.offset - len(self.tail)
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            data = f.read(stat.st_size - start)
+        if not data.startswith(self.tail):
+            self.rewritten = True
+            return None
+
+        # Leave a partly written last line for the next poll
+        appended = data[len(self.tail):data.rfind(b'\n') + 1]
+        if not appended:
+            return None
+        self.offset += len(appended)
+        self.tail = (self.tail + appended)[-self.CHECK_SIZE:]
+
+        reader = csv.reader(io.StringIO(appended.decode('utf-8'), newline=''))
+        return 'rows', [dict(zip(self.columns, values)) for values in reader if len(values) == len(self.columns)]
+
+
+class DashboardRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves files from memory with gzip, ETags and Cache-Control"""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, Nagle would hold the body back on kept-alive connections
+    disable_nagle_algorithm = True
+    cache = FileCache()
+    # Set by make_server() to answer /api/ and /events requests
+    api: Optional[DashboardAPI] = None
+    results_file: Optional[str] = None
 
-def start_server(port=8080):
+    def do_GET(self):
+        if self.path.startswith('/api/'):
+            self.send_api(head_only=False)
+        elif urlsplit(self.path).path == '/events':
+            self.send_events()
+        else:
+            self.send_cached(head_only=False)
+
+    def do_HEAD(self):
+        if self.path.startswith('/api/'):
+            self.send_api(head_only=True)
+        else:
+            self.send_cached(head_only=True)
+
+    def send_api(self, head_only: bool):
+        url = urlsplit(self.path)
+        try:
+            result = self.api.handle(url.path[len('/api/'):], parse_qs(url.query)) if self.api else None
+        except OSError:
+            self.send_error(503, "Results not available")
+            return
+        if result is None:
+            self.send_error(404, "Unknown API endpoint")
+            return
+
+        body = json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        gzip_body = gzip.compress(body, compresslevel=6) if len(body) > 1024 else None
+        self.send_body('', 'application/json; charset=utf-8', head_only,
+                       body, f'"{digest}"', gzip_body, f'"{digest}-gzip"')
+
+    def send_events(self):
+        """Server-Sent Events stream of rows appended to the results CSV"""
+        if not self.results_file:
+            self.send_error(404, "File not found")
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        tail = CSVTail(self.results_file)
+        last_write = time.monotonic()
+        try:
+            self.wfile.write(b'retry: 2000\n\n')
+            self.wfile.flush()
+            while True:
+                time.sleep(EVENTS_POLL_INTERVAL)
+                change = tail.poll()
+                if change:
+                    event, rows = change
+                    data = json.dumps({'rows': rows} if rows is not None else {}, ensure_ascii=False,
+                                      separators=(',', ':'))
+                    self.wfile.write(f'event: {event}\ndata: {data}\n\n'.encode('utf-8'))
+                elif time.monotonic() - last_write >= EVENTS_KEEPALIVE:
+                    # Comments keep proxies from closing an idle stream and detect closed tabs
+                    self.wfile.write(b': keep-alive\n\n')
+                else:
+                    continue
+                self.wfile.flush()
+                last_write = time.monotonic()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def send_cached(self, head_only: bool):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            # Directories and missing files keep the standard behaviour
+            return super().do_HEAD() if head_only else super().do_GET()
+
+        try:
+            cached = self.cache.get(path, self.guess_type(path))
+        except OSError:
+            self.send_error(404, "File not found")
+            return
+        if cached is None:
+            self.send_error(404, "File not found")
+            return
+
+        self.send_body(path, cached.content_type, head_only,
+                       cached.body, cached.etag, cached.gzip_body, cached.gzip_etag)
+
+    def send_body(self, path: str, content_type: str, head_only: bool,
+                  body: bytes, etag: str, gzip_body: Optional[bytes], gzip_etag: str):
+        """Send a response body, gzipped if the client accepts it, or 304 if the client has it"""
+        if gzip_body is not None and self.accepts_gzip():
+            body, etag = gzip_body, gzip_etag
+            encoding = 'gzip'
+        else:
+            encoding = None
+
+        if self.etag_matches(etag):
+            # No Content-Length: on a 304 it would have to be the full body's length
+            self.send_response(304)
+            self.send_common_headers(path, etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_common_headers(path, etag)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+
+        if not head_only:
+            self.wfile.write(body)
+
+    def send_common_headers(self, path: str, etag: str):
+        self.send_header('ETag', etag)
+        self.send_header('Vary', 'Accept-Encoding')
+        if not path or path.endswith(REVALIDATE_SUFFIXES):
+            self.send_header('Cache-Control', 'no-cache')
+        else:
+            self.send_header('Cache-Control', f'public, max-age={STATIC_MAX_AGE}')
+
+    def accepts_gzip(self) -> bool:
+        for coding in self.headers.get('Accept-Encoding', '').split(','):
+            name, _, params = coding.strip().partition(';')
+            if name.strip() in ('gzip', '*') and params.replace(' ', '') not in ('q=0', 'q=0.0'):
+                return True
+        return False
+
+    def etag_matches(self, etag: str) -> bool:
+        if_none_match = self.headers.get('If-None-Match')
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+
+class DashboardServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def make_server(port: int = 8080, production: bool = True, directory: Optional[str] = None,
+                host: str = "") -> socketserver.TCPServer:
+    """Create the dashboard server without starting it"""
+    directory = directory or str(Path(__file__).parent)
+    if production:
+        results_file = os.path.join(directory, 'geoguessr_results.csv')
+        handler_class = type('DashboardHandler', (DashboardRequestHandler,), {
+            'api': DashboardAPI(results_file),
+            'results_file': results_file
+        })
+        handler = functools.partial(handler_class, directory=directory)
+        return DashboardServer((host, port), handler)
+
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=directory)
+    return socketserver.TCPServer((host, port), handler)
+
+
+def start_server(port=8080, production=True, open_browser=True):
     """Start a local HTTP server to serve the dashboard"""
-    
+
     # Change to the script directory
     script_dir = Path(__file__).parent
     os.chdir(script_dir)
-    
+
     # Check if required files exist
     if not Path('dashboard.html').exists():
         print("❌ dashboard.html not found!")
         return
-    
+
     if not Path('geoguessr_results.csv').exists():
         print("❌ geoguessr_results.csv not found!")
         print("Please run the extractor first: python3 geoguessr_extractor.py")
         return
-    
+
     # Start server
-    handler = http.server.SimpleHTTPRequestHandler
-    
-    with socketserver.TCPServer(("", port), handler) as httpd:
-        print(f"🚀 GeoGuessr Dashboard Server")
+    with make_server(port, production, str(script_dir)) as httpd:
+        print(f"🚀 GeoGuessr Dashboard Server ({'threaded, gzip + ETag' if production else 'simple'})")
         print(f"📊 Dashboard: http://localhost:{port}/dashboard.html")
         print(f"📁 Files: http://localhost:{port}/")
         print(f"⏹️  Press Ctrl+C to stop")
         print()
-        
+
         # Open browser automatically
-        try:
-            webbrowser.open(f'http://localhost:{port}/dashboard.html')
-        except:
-            pass
-        
+        if open_browser:
+            try:
+                webbrowser.open(f'http://localhost:{port}/dashboard.html')
+            except:
+                pass
+
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
             print("\n👋 Server stopped!")
 
 if __name__ == "__main__":
-    start_server()
+    parser = argparse.ArgumentParser(description='Serve the GeoGuessr dashboard locally')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on')
+    parser.add_argument('--simple', action='store_true',
+                        help='Use the plain single-threaded server without compression or caching')
+    parser.add_argument('--no-browser', action='store_true', help='Do not open the dashboard in a browser')
+    args = parser.parse_args()
+
+    start_server(args.port, production=not args.simple, open_browser=not args.no_browser)
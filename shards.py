@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Time-sharded copies of the results for lazy dashboard loading
+
+Splits the extractor's rows into small CSV files, one per month or one per
+N challenges in date order, and writes a manifest listing each shard with
+its row count, date range, games and maps. The dashboard reads the
+manifest, loads the most recent shards first and fetches older ones only
+when they are needed.
+
+Shards whose content did not change are left untouched, so servers and
+browsers can keep their cached copies.
+"""
+
+import os
+import csv
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Iterable, Optional
+
+from aggregates import game_label
+
+SHARDS_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+
+
+def parse_shard_by(value: str) -> str:
+    """argparse type for --shards: 'month' or a number of challenges per shard"""
+    if value == 'month' or (value.isdigit() and int(value) > 0):
+        return value
+    raise argparse.ArgumentTypeError(f"expected 'month' or a positive number of challenges, got '{value}'")
+
+
+def shard_names(rows: Iterable[Dict[str, Any]], shard_by: str) -> Dict[str, str]:
+    """Shard file stem of every challenge (keyed by file name)"""
+    dates = {}
+    for row in rows:
+        dates.setdefault(row.get('file_name') or '', row.get('challenge_date') or '')
+
+    if shard_by == 'month':
+        return {key: date[:7] if date else 'undated' for key, date in dates.items()}
+
+    size = int(shard_by)
+    ordered = sorted(dates, key=lambda key: (dates[key], key))
+    return {key: f"part-{i // size + 1:04d}" for i, key in enumerate(ordered)}
+
+
+def file_digest(path: Path) -> Optional[str]:
+    if not path.exists():
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_shards(rows: Callable[[], Iterable[Dict[str, Any]]], columns: List[str], shard_by: str,
+                 shards_dir: str = 'geoguessr_shards') -> Dict[str, Any]:
+    """Write shard CSVs and their manifest, returns the manifest
+
+    rows is called twice and must give the same rows in output order each time,
+    so the rows never have to be held in memory.
+    """
+    folder = Path(shards_dir)
+    folder.mkdir(parents=True, exist_ok=True)
+    names = shard_names(rows(), shard_by)
+
+    shards: Dict[str, Dict[str, Any]] = {}
+    files = {}
+    try:
+        for row in rows():
+            name = names[row.get('file_name') or '']
+            shard = shards.get(name)
+            if shard is None:
+                tmp_file = folder / f"{name}.csv.tmp"
+                files[name] = open(tmp_file, 'w', newline='', encoding='utf-8')
+                writer = csv.DictWriter(files[name], fieldnames=columns, extrasaction='ignore')
+                writer.writeheader()
+                shard = shards[name] = {'writer': writer, 'rows': 0, 'from': None, 'to': None,
+                                        'challenges': set(), 'games': {}, 'maps': {}}
+            shard['writer'].writerow(row)
+            shard['rows'] += 1
+            date = row.get('challenge_date') or None
+            if date:
+                shard['from'] = min(shard['from'] or date, date)
+                shard['to'] = max(shard['to'] or date, date)
+            shard['challenges'].add(row.get('file_name'))
+            shard['games'].setdefault(game_label(row), None)
+            if row.get('map_name'):
+                shard['maps'].setdefault(row['map_name'], None)
+    finally:
+        for f in files.values():
+            f.close()
+
+    entries = []
+    for name in sorted(shards, key=lambda name: (shards[name]['from'] is not None, shards[name]['from'] or '', name)):
+        shard = shards[name]
+        shard_file = folder / f"{name}.csv"
+        tmp_file = folder / f"{name}.csv.tmp"
+        digest = file_digest(tmp_file)
+        if digest == file_digest(shard_file):
+            tmp_file.unlink()
+        else:
+            os.replace(tmp_file, shard_file)
+        entries.append({
+            'file': shard_file.name,
+            'label': name,
+            'from': shard['from'],
+            'to': shard['to'],
+            'rows': shard['rows'],
+            'challenges': len(shard['challenges']),
+            'games': list(shard['games']),
+            'maps': list(shard['maps']),
+            'sha256': digest[:16]
+        })
+
+    # Shards of months or parts that no longer have games
+    current = {entry['file'] for entry in entries}
+    for old_file in folder.glob('*.csv'):
+        if old_file.name not in current:
+            old_file.unlink()
+
+    manifest = {'version': SHARDS_VERSION, 'by': shard_by, 'rows': sum(entry['rows'] for entry in entries),
+                'shards': entries}
+    manifest_file = folder / MANIFEST_NAME
+    tmp_file = folder / (MANIFEST_NAME + '.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_file, manifest_file)
+    return manifest
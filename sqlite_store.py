@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+SQLite storage for GeoGuessr results
+
+Stores the extractor's rows in normalized tables instead of one wide CSV:
+- challenges: one row per challenge with its map and game settings
+- players: one row per player name
+- challenge_results: position and totals of a player in a challenge
+- round_results: points, duration and steps of a player in each round
+
+Writes are batched upserts in a single transaction, so adding new games
+only touches the new rows, and a rewritten game replaces its player
+results. The `results` view gives back the CSV layout.
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator, Set
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS challenges (
+    challenge_id TEXT PRIMARY KEY,
+    file_name TEXT,
+    challenge_date TEXT,
+    challenge_title TEXT,
+    map_name TEXT,
+    map_creator TEXT,
+    game_settings TEXT,
+    time_limit TEXT,
+    movement TEXT,
+    panning TEXT,
+    zooming TEXT
+);
+
+CREATE TABLE IF NOT EXISTS players (
+    player_id INTEGER PRIMARY KEY,
+    player_name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS challenge_results (
+    challenge_id TEXT NOT NULL REFERENCES challenges(challenge_id) ON DELETE CASCADE,
+    player_id INTEGER NOT NULL REFERENCES players(player_id),
+    position INTEGER,
+    total_points INTEGER,
+    total_duration TEXT,
+    total_steps INTEGER,
+    PRIMARY KEY (challenge_id, player_id)
+);
+
+CREATE TABLE IF NOT EXISTS round_results (
+    challenge_id TEXT NOT NULL REFERENCES challenges(challenge_id) ON DELETE CASCADE,
+    player_id INTEGER NOT NULL REFERENCES players(player_id),
+    round INTEGER NOT NULL,
+    points INTEGER,
+    duration TEXT,
+    steps INTEGER,
+    PRIMARY KEY (challenge_id, player_id, round)
+);
+
+CREATE INDEX IF NOT EXISTS idx_challenges_map ON challenges(map_name);
+CREATE INDEX IF NOT EXISTS idx_challenges_date ON challenges(challenge_date);
+CREATE INDEX IF NOT EXISTS idx_challenges_file ON challenges(file_name);
+CREATE INDEX IF NOT EXISTS idx_challenge_results_player ON challenge_results(player_id);
+CREATE INDEX IF NOT EXISTS idx_round_results_player ON round_results(player_id, round);
+
+CREATE VIEW IF NOT EXISTS results AS
+SELECT
+    c.file_name, c.challenge_id, c.challenge_date, c.challenge_title,
+    c.map_name, c.map_creator, c.game_settings, c.time_limit, c.movement, c.panning, c.zooming,
+    cr.position, p.player_name,
+    MAX(CASE WHEN r.round = 1 THEN r.points END) AS round_1_points,
+    MAX(CASE WHEN r.round = 1 THEN r.duration END) AS round_1_duration,
+    MAX(CASE WHEN r.round = 1 THEN r.steps END) AS round_1_steps,
+    MAX(CASE WHEN r.round = 2 THEN r.points END) AS round_2_points,
+    MAX(CASE WHEN r.round = 2 THEN r.duration END) AS round_2_duration,
+    MAX(CASE WHEN r.round = 2 THEN r.steps END) AS round_2_steps,
+    MAX(CASE WHEN r.round = 3 THEN r.points END) AS round_3_points,
+    MAX(CASE WHEN r.round = 3 THEN r.duration END) AS round_3_duration,
+    MAX(CASE WHEN r.round = 3 THEN r.steps END) AS round_3_steps,
+    MAX(CASE WHEN r.round = 4 THEN r.points END) AS round_4_points,
+    MAX(CASE WHEN r.round = 4 THEN r.duration END) AS round_4_duration,
+    MAX(CASE WHEN r.round = 4 THEN r.steps END) AS round_4_steps,
+    MAX(CASE WHEN r.round = 5 THEN r.points END) AS round_5_points,
+    MAX(CASE WHEN r.round = 5 THEN r.duration END) AS round_5_duration,
+    MAX(CASE WHEN r.round = 5 THEN r.steps END) AS round_5_steps,
+    cr.total_points, cr.total_duration, cr.total_steps
+FROM challenge_results cr
+JOIN challenges c ON c.challenge_id = cr.challenge_id
+JOIN players p ON p.player_id = cr.player_id
+LEFT JOIN round_results r ON r.challenge_id = cr.challenge_id AND r.player_id = cr.player_id
+GROUP BY cr.challenge_id, cr.player_id;
+"""
+
+CHALLENGE_COLUMNS = [
+    'challenge_id', 'file_name', 'challenge_date', 'challenge_title',
+    'map_name', 'map_creator', 'game_settings', 'time_limit', 'movement', 'panning', 'zooming'
+]
+
+
+def challenge_key(row: Dict[str, Any]) -> str:
+    """Challenge ID of a row, falling back to the file name for pages without one"""
+    return row.get('challenge_id') or row['file_name']
+
+
+class SQLiteResultsStore:
+    def __init__(self, db_file: str):
+        self.db_file = Path(db_file)
+        self.conn = sqlite3.connect(str(self.db_file))
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def player_ids(self, names: Iterable[str]) -> Dict[str, int]:
+        """Look up player IDs, creating players that are not stored yet"""
+        names = sorted(set(names))
+        self.conn.executemany('INSERT OR IGNORE INTO players (player_name) VALUES (?)', [(name,) for name in names])
+
+        ids = {}
+        # Stay below SQLite's limit on bound parameters
+        for i in range(0, len(names), 500):
+            batch = names[i:i + 500]
+            placeholders = ','.join('?' * len(batch))
+            ids.update(self.conn.execute(
+                f'SELECT player_name, player_id FROM players WHERE player_name IN ({placeholders})', batch))
+        return ids
+
+    def upsert_rows(self, rows: List[Dict[str, Any]]) -> int:
+        """Insert or update extractor rows in one transaction, returns the number of rows written
+
+        The player results of every challenge in rows are replaced, so players
+        no longer in a re-extracted challenge are dropped.
+        """
+        rows = [row for row in rows if row.get('player_name')]
+        if not rows:
+            return 0
+
+        with self.conn:
+            challenges = {}
+            for row in rows:
+                challenges[challenge_key(row)] = [challenge_key(row)] + [row.get(c) for c in CHALLENGE_COLUMNS[1:]]
+
+            updates = ', '.join(f'{c} = excluded.{c}' for c in CHALLENGE_COLUMNS[1:])
+            self.conn.executemany(
+                f'INSERT INTO challenges ({", ".join(CHALLENGE_COLUMNS)}) '
+                f'VALUES ({", ".join("?" * len(CHALLENGE_COLUMNS))}) '
+                f'ON CONFLICT (challenge_id) DO UPDATE SET {updates}',
+                list(challenges.values()))
+
+            player_ids = self.player_ids(row['player_name'] for row in rows)
+
+            for table in ('round_results', 'challenge_results'):
+                self.conn.executemany(f'DELETE FROM {table} WHERE challenge_id = ?',
+                                      [(challenge_id,) for challenge_id in challenges])
+
+            self.conn.executemany(
+                'INSERT INTO challenge_results (challenge_id, player_id, position, total_points, total_duration, total_steps) '
+                'VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (challenge_id, player_id) DO UPDATE SET position = excluded.position, '
+                'total_points = excluded.total_points, total_duration = excluded.total_duration, '
+                'total_steps = excluded.total_steps',
+                [(challenge_key(row), player_ids[row['player_name']], row.get('position'), row.get('total_points'),
+                  row.get('total_duration'), row.get('total_steps')) for row in rows])
+
+            self.conn.executemany(
+                'INSERT INTO round_results (challenge_id, player_id, round, points, duration, steps) '
+                'VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (challenge_id, player_id, round) DO UPDATE SET points = excluded.points, '
+                'duration = excluded.duration, steps = excluded.steps',
+                [(challenge_key(row), player_ids[row['player_name']], round_num, row.get(f'round_{round_num}_points'),
+                  row.get(f'round_{round_num}_duration'), row.get(f'round_{round_num}_steps'))
+                 for row in rows for round_num in range(1, 6)])
+
+        return len(rows)
+
+    def delete_files(self, file_names: Iterable[str]) -> int:
+        """Delete the challenges extracted from the given files, returns the number deleted"""
+        file_names = list(file_names)
+        if not file_names:
+            return 0
+
+        with self.conn:
+            cursor = self.conn.executemany('DELETE FROM challenges WHERE file_name = ?', [(name,) for name in file_names])
+        return cursor.rowcount
+
+    def delete_challenges(self, challenge_ids: Iterable[str]) -> int:
+        """Delete challenges by ID, returns the number deleted"""
+        challenge_ids = list(challenge_ids)
+        if not challenge_ids:
+            return 0
+
+        with self.conn:
+            cursor = self.conn.executemany('DELETE FROM challenges WHERE challenge_id = ?',
+                                           [(challenge_id,) for challenge_id in challenge_ids])
+        return cursor.rowcount
+
+    def file_names(self) -> Set[str]:
+        """Names of the files with stored challenges"""
+        return {name for name, in self.conn.execute('SELECT DISTINCT file_name FROM challenges')}
+
+    def fetch_rows(self) -> Iterator[Dict[str, Any]]:
+        """All results in the flat CSV layout, read lazily"""
+        cursor = self.conn.execute('SELECT * FROM results ORDER BY file_name, position')
+        columns = [description[0] for description in cursor.description]
+        return (dict(zip(columns, values)) for values in cursor)